@@ -0,0 +1,808 @@
+import numpy as np
+import pandas as pd
+
+from components.data import normalizar_unidade
+
+
+METRICAS_CUBO = [
+    "VBP",
+    "Área (ha)",
+    "Produção",
+]
+
+
+def montar_cubo(df: pd.DataFrame) -> dict:
+    # Cubo denso Município x Cultura x Safra para cada métrica.
+    # Os eixos seguem a ordem alfabética (Município/Cultura) e Safra_ordem.
+    base = df.dropna(subset=["Município", "Cultura", "Safra"])
+
+    cod_municipio, municipios = pd.factorize(base["Município"], sort=True)
+    cod_cultura, culturas = pd.factorize(base["Cultura"], sort=True)
+
+    safras_ordem = np.sort(base["Safra_ordem"].unique())
+    cod_safra = np.searchsorted(safras_ordem, base["Safra_ordem"].to_numpy())
+
+    safras = (
+        base.drop_duplicates("Safra_ordem")
+        .set_index("Safra_ordem")
+        .loc[safras_ordem, "Safra"]
+        .to_numpy()
+    )
+
+    forma = (len(municipios), len(culturas), len(safras_ordem))
+    posicao = np.ravel_multi_index((cod_municipio, cod_cultura, cod_safra), forma)
+    tamanho = int(np.prod(forma))
+
+    # Código IBGE de cada município (disponível apenas nas safras recentes)
+    codigos = (
+        base.dropna(subset=["Código Município"])
+        .drop_duplicates("Município", keep="last")
+        .set_index("Município")["Código Município"]
+        .astype("int64")
+        .astype(str)
+        .reindex(municipios)
+        .to_numpy()
+    )
+
+    cubo = {
+        "municipios": np.asarray(municipios),
+        "codigos": codigos,
+        "culturas": np.asarray(culturas),
+        "safras": safras,
+        "safras_ordem": safras_ordem,
+    }
+
+    for metrica in METRICAS_CUBO:
+        valores = base[metrica].fillna(0.0).to_numpy(dtype=float)
+        cubo[metrica] = np.bincount(
+            posicao, weights=valores, minlength=tamanho
+        ).reshape(forma)
+
+    return cubo
+
+
+def indices_safras(cubo: dict, safra_inicio: int, safra_fim: int) -> np.ndarray:
+    ordem = cubo["safras_ordem"]
+    return np.flatnonzero((ordem >= safra_inicio) & (ordem <= safra_fim))
+
+
+def totais(cubo: dict, metrica: str, eixo: str) -> np.ndarray:
+    # eixo="Município" -> matriz (municípios x safras)
+    # eixo="Cultura"   -> matriz (culturas x safras)
+    soma_em = 1 if eixo == "Município" else 0
+    return cubo[metrica].sum(axis=soma_em)
+
+
+def crescimento_anual(matriz: np.ndarray) -> np.ndarray:
+    # Variação percentual em relação à safra anterior (NaN sem base)
+    resultado = np.full(matriz.shape, np.nan)
+
+    anterior = matriz[:, :-1]
+    atual = matriz[:, 1:]
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        resultado[:, 1:] = np.where(
+            anterior > 0, (atual / anterior - 1) * 100, np.nan
+        )
+
+    return resultado
+
+
+def cagr(matriz: np.ndarray) -> np.ndarray:
+    # Taxa de crescimento anual composta entre a primeira e a última safra
+    periodos = matriz.shape[1] - 1
+
+    if periodos < 1:
+        return np.full(matriz.shape[0], np.nan)
+
+    inicio = matriz[:, 0]
+    fim = matriz[:, -1]
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        taxa = (fim / inicio) ** (1 / periodos) - 1
+
+    return np.where((inicio > 0) & (fim > 0), taxa * 100, np.nan)
+
+
+def ranking(matriz: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    # Posição estadual (1 = maior valor) e percentil por safra.
+    # Entidades sem produção na safra ficam fora do ranking (NaN).
+    validos = matriz > 0
+    ordem = np.argsort(np.where(validos, -matriz, np.inf), axis=0, kind="stable")
+
+    posicao = np.empty(matriz.shape)
+    np.put_along_axis(
+        posicao,
+        ordem,
+        np.arange(1, matriz.shape[0] + 1, dtype=float)[:, None],
+        axis=0,
+    )
+
+    total = validos.sum(axis=0)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        percentil = np.where(
+            total > 1, (total - posicao) / (total - 1) * 100, 100.0
+        )
+
+    posicao[~validos] = np.nan
+    percentil[~validos] = np.nan
+
+    return posicao, percentil
+
+
+def tabela_crescimento(
+    cubo: dict,
+    eixo: str,
+    safra_inicio: int,
+    safra_fim: int,
+) -> tuple[pd.DataFrame, pd.DataFrame]:
+    # Calcula de uma só vez, para todo o estado, crescimento, CAGR e ranking
+    # de VBP e Área (ha). Retorna a série por safra e o CAGR do período.
+    indices = indices_safras(cubo, safra_inicio, safra_fim)
+    nomes = cubo["municipios"] if eixo == "Município" else cubo["culturas"]
+    safras = cubo["safras"][indices]
+
+    serie = pd.DataFrame(
+        {
+            eixo: np.repeat(nomes, len(indices)),
+            "Safra": np.tile(safras, len(nomes)),
+            "Safra_ordem": np.tile(cubo["safras_ordem"][indices], len(nomes)),
+        }
+    )
+    periodo = pd.DataFrame({eixo: nomes})
+
+    for metrica in ["VBP", "Área (ha)"]:
+        matriz = totais(cubo, metrica, eixo)[:, indices]
+        posicao, percentil = ranking(matriz)
+
+        serie[metrica] = matriz.ravel()
+        serie[f"{metrica} - Crescimento (%)"] = crescimento_anual(matriz).ravel()
+        serie[f"{metrica} - Ranking"] = posicao.ravel()
+        serie[f"{metrica} - Percentil"] = percentil.ravel()
+
+        periodo[f"{metrica} - CAGR (%)"] = cagr(matriz)
+
+    return serie, periodo
+
+
+QUANTIS = {
+    "P10": 0.10,
+    "P25": 0.25,
+    "Mediana": 0.50,
+    "P75": 0.75,
+    "P90": 0.90,
+}
+
+
+def estatisticas_distribuicao(matriz: np.ndarray, top_k: int = 10) -> dict:
+    # Estatísticas por coluna (safra) a partir de uma única ordenação.
+    # Valores não positivos ficam no início do vetor ordenado e não entram
+    # nos percentis, no Gini, no HHI nem na participação do top-k.
+    total_linhas = matriz.shape[0]
+    ordenado = np.sort(np.where(matriz > 0, matriz, 0.0), axis=0)
+
+    validos = (ordenado > 0).sum(axis=0)
+    inicio = total_linhas - validos
+    soma = ordenado.sum(axis=0)
+
+    resultado = {}
+
+    # Percentis com interpolação linear sobre o trecho válido ordenado
+    for nome, q in QUANTIS.items():
+        posicao = inicio + q * np.maximum(validos - 1, 0)
+        baixo = np.floor(posicao).astype(int).clip(0, total_linhas - 1)
+        alto = np.ceil(posicao).astype(int).clip(0, total_linhas - 1)
+        fracao = posicao - baixo
+
+        v_baixo = np.take_along_axis(ordenado, baixo[None, :], axis=0)[0]
+        v_alto = np.take_along_axis(ordenado, alto[None, :], axis=0)[0]
+
+        resultado[nome] = np.where(
+            validos > 0, v_baixo + (v_alto - v_baixo) * fracao, np.nan
+        )
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        # Gini: posição i (1..n) considerada apenas entre os valores válidos
+        posicoes = np.arange(1, total_linhas + 1, dtype=float)[:, None]
+        soma_ponderada = (posicoes * ordenado).sum(axis=0) - inicio * soma
+        gini = 2 * soma_ponderada / (validos * soma) - (validos + 1) / validos
+
+        participacao = ordenado / soma
+        hhi = (participacao ** 2).sum(axis=0) * 10000
+
+        top = ordenado[-top_k:].sum(axis=0) / soma * 100
+
+    resultado["Gini"] = np.where(validos > 0, gini, np.nan)
+    resultado["HHI"] = np.where(validos > 0, hhi, np.nan)
+    resultado[f"Top {top_k} (%)"] = np.where(validos > 0, top, np.nan)
+    resultado["Quantidade"] = validos
+
+    return resultado
+
+
+def tabela_distribuicao(
+    cubo: dict,
+    safra_inicio: int,
+    safra_fim: int,
+    top_k: int = 10,
+) -> pd.DataFrame:
+    # Distribuição do VBP agregado por Município e por Cultura em cada safra
+    indices = indices_safras(cubo, safra_inicio, safra_fim)
+    tabelas = []
+
+    for eixo in ["Município", "Cultura"]:
+        matriz = totais(cubo, "VBP", eixo)[:, indices]
+
+        tabela = pd.DataFrame(estatisticas_distribuicao(matriz, top_k))
+        tabela.insert(0, "Nível", eixo)
+        tabela.insert(1, "Safra", cubo["safras"][indices])
+        tabela.insert(2, "Safra_ordem", cubo["safras_ordem"][indices])
+
+        tabelas.append(tabela)
+
+    return pd.concat(tabelas, ignore_index=True)
+
+
+def matriz_perfil(cubo: dict, safra_inicio: int, safra_fim: int) -> np.ndarray:
+    # Composição do VBP de cada município por Cultura no período, com as
+    # linhas normalizadas (norma L2) para similaridade de cosseno.
+    indices = indices_safras(cubo, safra_inicio, safra_fim)
+    perfil = cubo["VBP"][:, :, indices].sum(axis=2)
+
+    norma = np.linalg.norm(perfil, axis=1, keepdims=True)
+
+    return np.divide(
+        perfil, norma, out=np.zeros_like(perfil), where=norma > 0
+    )
+
+
+def municipios_semelhantes(
+    cubo: dict,
+    perfil: np.ndarray,
+    municipio: str,
+    quantidade: int = 10,
+) -> pd.DataFrame:
+    municipios = cubo["municipios"]
+    indice = np.searchsorted(municipios, municipio)
+
+    if indice >= len(municipios) or municipios[indice] != municipio:
+        return pd.DataFrame(columns=["Município", "Similaridade"])
+
+    similaridade = perfil @ perfil[indice]
+    similaridade[indice] = -np.inf
+
+    quantidade = min(quantidade, len(municipios) - 1)
+    melhores = np.argpartition(-similaridade, quantidade - 1)[:quantidade]
+    melhores = melhores[np.argsort(-similaridade[melhores], kind="stable")]
+
+    return pd.DataFrame(
+        {
+            "Município": municipios[melhores],
+            "Similaridade": similaridade[melhores],
+        }
+    )
+
+
+def valores_mapa(
+    cubo: dict,
+    metrica: str,
+    safra_inicio: int,
+    safra_fim: int,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    # Códigos IBGE, safras e matriz (safras x municípios) para o mapa.
+    # Municípios sem código conhecido ficam de fora.
+    indices = indices_safras(cubo, safra_inicio, safra_fim)
+    com_codigo = pd.notna(cubo["codigos"])
+
+    matriz = totais(cubo, metrica, "Município")[com_codigo][:, indices]
+
+    return cubo["codigos"][com_codigo], cubo["safras"][indices], matriz.T
+
+
+COLUNAS_CULTURA = [
+    "VBP",
+    "Área (ha)",
+    "Produção",
+    "Abate / Comercialização",
+]
+
+
+SEM_UNIDADE = "N/A"
+
+
+def particionar_culturas(df: pd.DataFrame) -> dict:
+    # Agrega todas as culturas de uma vez por (Município, Safra_ordem) e
+    # separa o resultado por Cultura. A Produção só é somada na unidade
+    # predominante da cultura; as demais unidades ficam registradas à parte.
+    base = df.dropna(subset=["Município", "Cultura"]).assign(
+        Unidade=lambda d: normalizar_unidade(d["Unidade"]).fillna(SEM_UNIDADE)
+    )
+
+    contagem = base.groupby(["Cultura", "Unidade"]).size()
+    predominante = (
+        contagem.sort_values(ascending=False)
+        .reset_index()
+        .drop_duplicates("Cultura")
+        .set_index("Cultura")["Unidade"]
+    )
+
+    base["Produção"] = base["Produção"].where(
+        base["Unidade"] == base["Cultura"].map(predominante), 0.0
+    )
+
+    agregada = base.groupby(
+        ["Cultura", "Município", "Safra_ordem"], sort=True
+    )[COLUNAS_CULTURA].sum()
+
+    unidades = contagem.reset_index().groupby("Cultura")["Unidade"].agg(list)
+
+    return {
+        cultura: {
+            "dados": grupo.droplevel("Cultura"),
+            "unidade": predominante[cultura],
+            "outras_unidades": [
+                u for u in unidades[cultura] if u not in (predominante[cultura], SEM_UNIDADE)
+            ],
+        }
+        for cultura, grupo in agregada.groupby(level="Cultura", sort=False)
+    }
+
+
+def grade_municipio_safra(cubo: dict, municipios, safra_inicio: int, safra_fim: int) -> pd.MultiIndex:
+    # Grade densa Município x Safra usada como base das visões por cultura
+    indices = indices_safras(cubo, safra_inicio, safra_fim)
+
+    return pd.MultiIndex.from_product(
+        [sorted(municipios), cubo["safras_ordem"][indices]],
+        names=["Município", "Safra_ordem"],
+    )
+
+
+def dados_cultura(cubo: dict, particao: dict, cultura: str, grade: pd.MultiIndex) -> tuple[pd.DataFrame, str, list]:
+    # Reindexa a partição da cultura na grade (zeros onde não há produção)
+    info = particao.get(cultura)
+
+    if info is None:
+        dados = pd.DataFrame(0.0, index=grade, columns=COLUNAS_CULTURA)
+        unidade, outras = SEM_UNIDADE, []
+    else:
+        dados = info["dados"].reindex(grade, fill_value=0.0)
+        unidade, outras = info["unidade"], info["outras_unidades"]
+
+    dados = dados.reset_index()
+
+    safras = pd.Series(cubo["safras"], index=cubo["safras_ordem"])
+    dados.insert(1, "Safra", dados["Safra_ordem"].map(safras))
+    dados["Cultura"] = cultura
+    dados["Unidade"] = unidade
+
+    return dados, unidade, outras
+
+
+SEM_CLASSIFICACAO = "Não classificado"
+
+
+def classificar_culturas(df: pd.DataFrame) -> pd.DataFrame:
+    # Grupo e Subgrupo de cada Cultura segundo a classificação mais recente.
+    # Entre 18-19 e 21-22 o Grupo vem codificado (A-F); o código é traduzido
+    # para o nome usado nas safras seguintes pelas culturas em comum.
+    base = (
+        df.dropna(subset=["Cultura", "Grupo"])
+        .sort_values("Safra_ordem")
+        .assign(
+            Grupo=lambda d: d["Grupo"].astype(str).str.strip(),
+            Subgrupo=lambda d: d["Subgrupo"].astype("string").str.strip().str.capitalize(),
+        )
+    )
+
+    codificado = base["Grupo"].str.len() == 1
+
+    nome = base[~codificado].groupby("Cultura")["Grupo"].last()
+    codigo = base[codificado].groupby("Cultura")["Grupo"].last()
+
+    traducao = (
+        pd.concat([codigo.rename("codigo"), nome.rename("nome")], axis=1, join="inner")
+        .groupby("codigo")["nome"]
+        .agg(lambda nomes: nomes.mode().iloc[0])
+    )
+
+    grupo = nome.combine_first(codigo.map(traducao))
+    subgrupo = base.dropna(subset=["Subgrupo"]).groupby("Cultura")["Subgrupo"].last()
+
+    classificacao = pd.DataFrame({"Grupo": grupo, "Subgrupo": subgrupo})
+
+    # O Subgrupo só existe a partir de 20-21: nomes de cultura que saíram de
+    # uso antes disso herdam a classificação do nome atual do mesmo código
+    codigos = (
+        df.dropna(subset=["Cultura", "Código Cultura"])
+        .sort_values("Safra_ordem")
+        .groupby("Cultura")["Código Cultura"]
+        .last()
+    )
+    por_codigo = (
+        classificacao.dropna(subset=["Subgrupo"])
+        .join(codigos, how="inner")
+        .groupby("Código Cultura")[["Grupo", "Subgrupo"]]
+        .last()
+    )
+    herdada = por_codigo.reindex(codigos.to_numpy()).set_axis(codigos.index)
+
+    return classificacao.dropna(subset=["Subgrupo"]).combine_first(herdada).combine_first(classificacao)
+
+
+def montar_hierarquia(cubo: dict, classificacao: pd.DataFrame) -> dict:
+    # Agregados Grupo e Subgrupo de todo o cubo, materializados uma vez por
+    # versão dos dados; o nível Cultura é o próprio cubo.
+    classes = classificacao.reindex(cubo["culturas"]).fillna(SEM_CLASSIFICACAO)
+
+    cod_subgrupo, subgrupos = pd.factorize(
+        pd.MultiIndex.from_arrays([classes["Grupo"], classes["Subgrupo"]]),
+        sort=True,
+    )
+    cod_grupo, grupos = pd.factorize(subgrupos.get_level_values(0), sort=True)
+
+    def somar(valores: np.ndarray, codigos: np.ndarray, tamanho: int) -> np.ndarray:
+        # Soma o eixo das culturas (1) segundo os códigos do nível superior
+        resultado = np.zeros((valores.shape[0], tamanho, valores.shape[2]))
+        np.add.at(resultado, (slice(None), codigos), valores)
+        return resultado
+
+    vbp_subgrupo = somar(cubo["VBP"], cod_subgrupo, len(subgrupos))
+
+    return {
+        "grupos": np.asarray(grupos),
+        "subgrupos": subgrupos,
+        "subgrupo_da_cultura": cod_subgrupo,
+        "grupo_do_subgrupo": cod_grupo,
+        "VBP_subgrupo": vbp_subgrupo,
+        "VBP_grupo": somar(vbp_subgrupo, cod_grupo, len(grupos)),
+    }
+
+
+def tabela_hierarquia(
+    cubo: dict,
+    hierarquia: dict,
+    municipios,
+    safra_inicio: int,
+    safra_fim: int,
+) -> pd.DataFrame:
+    # Nós Grupo -> Subgrupo -> Cultura com o VBP da seleção, prontos para
+    # treemap/sunburst (ids, parents, labels, values)
+    indices = indices_safras(cubo, safra_inicio, safra_fim)
+    linhas = np.flatnonzero(np.isin(cubo["municipios"], list(municipios))) if municipios else slice(None)
+
+    def selecionar(valores: np.ndarray) -> np.ndarray:
+        return valores[linhas][:, :, indices].sum(axis=(0, 2))
+
+    vbp_grupo = selecionar(hierarquia["VBP_grupo"])
+    vbp_subgrupo = selecionar(hierarquia["VBP_subgrupo"])
+    vbp_cultura = selecionar(cubo["VBP"])
+
+    grupos = hierarquia["grupos"]
+    subgrupos = hierarquia["subgrupos"]
+    id_subgrupo = np.array([f"{g}/{s}" for g, s in subgrupos], dtype=object)
+
+    nos = pd.concat(
+        [
+            pd.DataFrame(
+                {
+                    "id": grupos,
+                    "parent": "",
+                    "label": grupos,
+                    "Nível": "Grupo",
+                    "VBP": vbp_grupo,
+                }
+            ),
+            pd.DataFrame(
+                {
+                    "id": id_subgrupo,
+                    "parent": grupos[hierarquia["grupo_do_subgrupo"]],
+                    "label": subgrupos.get_level_values(1),
+                    "Nível": "Subgrupo",
+                    "VBP": vbp_subgrupo,
+                }
+            ),
+            pd.DataFrame(
+                {
+                    "id": id_subgrupo[hierarquia["subgrupo_da_cultura"]] + "/" + cubo["culturas"].astype(object),
+                    "parent": id_subgrupo[hierarquia["subgrupo_da_cultura"]],
+                    "label": cubo["culturas"],
+                    "Nível": "Cultura",
+                    "VBP": vbp_cultura,
+                }
+            ),
+        ],
+        ignore_index=True,
+    )
+
+    return nos[nos["VBP"] > 0]
+
+
+def montar_regioes(cubo: dict, df: pd.DataFrame) -> dict:
+    # Agregados Região x Safra de VBP, Área (ha) e número de culturas,
+    # materializados uma vez por versão dos dados. A Região só é informada
+    # a partir de 21-22; vale para todas as safras a mais recente de cada
+    # município.
+    regiao_municipio = (
+        df.dropna(subset=["Região"])
+        .sort_values("Safra_ordem")
+        .groupby("Município")["Região"]
+        .last()
+        .reindex(cubo["municipios"])
+        .fillna(SEM_CLASSIFICACAO)
+    )
+
+    cod_regiao, regioes = pd.factorize(regiao_municipio, sort=True)
+
+    def somar(valores: np.ndarray) -> np.ndarray:
+        resultado = np.zeros((len(regioes),) + valores.shape[1:])
+        np.add.at(resultado, cod_regiao, valores)
+        return resultado
+
+    # Cultura presente na região quando algum município tem VBP ou Área
+    presente = (cubo["VBP"] > 0) | (cubo["Área (ha)"] > 0)
+
+    return {
+        "regioes": np.asarray(regioes),
+        "regiao_do_municipio": cod_regiao,
+        "VBP": somar(totais(cubo, "VBP", "Município")),
+        "Área (ha)": somar(totais(cubo, "Área (ha)", "Município")),
+        "total_culturas": (somar(presente.astype(float)) > 0).sum(axis=1),
+        "total_municipios": np.bincount(cod_regiao, minlength=len(regioes)),
+    }
+
+
+def tabela_regioes(cubo: dict, regioes: dict, selecionadas, safra_inicio: int, safra_fim: int) -> pd.DataFrame:
+    # Série Região x Safra (com o total do Estado) a partir dos agregados
+    indices = indices_safras(cubo, safra_inicio, safra_fim)
+    nomes = regioes["regioes"]
+    linhas = np.flatnonzero(np.isin(nomes, list(selecionadas))) if selecionadas else np.arange(len(nomes))
+
+    vbp = regioes["VBP"][:, indices]
+    vbp_estado = vbp.sum(axis=0)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        participacao = np.where(vbp_estado > 0, vbp / vbp_estado * 100, np.nan)
+
+    tabela = pd.DataFrame(
+        {
+            "Região": np.repeat(nomes[linhas], len(indices)),
+            "Safra": np.tile(cubo["safras"][indices], len(linhas)),
+            "Safra_ordem": np.tile(cubo["safras_ordem"][indices], len(linhas)),
+            "VBP": vbp[linhas].ravel(),
+            "Área (ha)": regioes["Área (ha)"][linhas][:, indices].ravel(),
+            "total_culturas": regioes["total_culturas"][linhas][:, indices].ravel(),
+            "Participação no Estado (%)": participacao[linhas].ravel(),
+            "total_municipios": np.repeat(regioes["total_municipios"][linhas], len(indices)),
+        }
+    )
+
+    return tabela
+
+
+def tabela_participacao(cubo: dict, safra_inicio: int, safra_fim: int) -> tuple[pd.DataFrame, pd.DataFrame]:
+    # Participação de cada município no VBP estadual por safra (base do
+    # componente VBP do índice da cota-parte do ICMS), sua variação em pontos
+    # percentuais e a contribuição de cada cultura, todos de uma só vez.
+    indices = indices_safras(cubo, safra_inicio, safra_fim)
+    vbp = cubo["VBP"][:, :, indices]
+
+    estado = vbp.sum(axis=(0, 1))
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        # (municípios x culturas x safras) em % do VBP estadual
+        contribuicao = np.where(estado > 0, vbp / estado * 100, 0.0)
+
+    participacao = contribuicao.sum(axis=1)
+
+    variacao = np.full(participacao.shape, np.nan)
+    variacao[:, 1:] = np.diff(participacao, axis=1)
+
+    municipios = cubo["municipios"]
+    safras = cubo["safras"][indices]
+
+    resumo = pd.DataFrame(
+        {
+            "Município": np.repeat(municipios, len(indices)),
+            "Código Município": np.repeat(cubo["codigos"], len(indices)),
+            "Safra": np.tile(safras, len(municipios)),
+            "Safra_ordem": np.tile(cubo["safras_ordem"][indices], len(municipios)),
+            "VBP": vbp.sum(axis=1).ravel(),
+            "VBP Estadual": np.tile(estado, len(municipios)),
+            "Participação (%)": participacao.ravel(),
+            "Variação (p.p.)": variacao.ravel(),
+        }
+    )
+
+    # Contribuição por cultura apenas onde há VBP (formato longo, esparso)
+    m, c, s = np.nonzero(vbp > 0)
+    culturas = pd.DataFrame(
+        {
+            "Município": municipios[m],
+            "Cultura": cubo["culturas"][c],
+            "Safra": safras[s],
+            "Safra_ordem": cubo["safras_ordem"][indices][s],
+            "VBP": vbp[m, c, s],
+            "Contribuição (p.p.)": contribuicao[m, c, s],
+        }
+    )
+
+    return resumo, culturas
+
+
+LIMITE_Z_ROBUSTO = 3.5
+LIMITE_SALTO = 5.0  # razão mínima entre safras consecutivas (ou seu inverso)
+MINIMO_VARIACOES = 4  # variações válidas por série para estimar a dispersão
+TOLERANCIA_MAD = 1e-9  # MAD relativo abaixo do qual a dispersão é tratada como zero
+PESO_MINIMO_CULTURA = 0.01  # participação mínima da cultura no VBP do município
+
+
+def z_robusto(valores: np.ndarray) -> np.ndarray:
+    # z-score robusto (mediana/MAD) ao longo do último eixo, ignorando NaN.
+    # Com MAD zero usa o desvio absoluto médio (Iglewicz e Hoaglin).
+    validos = np.isfinite(valores).sum(axis=-1, keepdims=True)
+    resultado = np.full(valores.shape, np.nan)
+
+    linhas = np.flatnonzero(validos[..., 0] > 0)
+    valores = valores[linhas]
+
+    mediana = np.nanmedian(valores, axis=-1, keepdims=True)
+    desvio = np.abs(valores - mediana)
+    mad = np.nanmedian(desvio, axis=-1, keepdims=True)
+    media_desvio = np.nanmean(desvio, axis=-1, keepdims=True)
+
+    # MAD da ordem do erro de arredondamento conta como zero (variações
+    # iguais calculadas por caminhos diferentes diferem em ~1e-15)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        z = np.where(
+            mad > TOLERANCIA_MAD * np.maximum(1, np.abs(mediana)),
+            0.6745 * (valores - mediana) / mad,
+            (valores - mediana) / (1.253314 * media_desvio),
+        )
+
+    resultado[linhas] = z
+    return resultado
+
+
+def detectar_saltos(cubo: dict) -> pd.DataFrame:
+    # Saltos entre safras consecutivas em cada série Município x Cultura,
+    # avaliados de uma vez sobre o cubo pelo z robusto da variação em log
+    series = []
+
+    # Peso de cada cultura no VBP do município em cada safra: saltos em
+    # culturas marginais não mudam nenhum indicador e só poluem a revisão
+    vbp = cubo["VBP"]
+    total = vbp.sum(axis=1, keepdims=True)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        peso = np.where(total > 0, vbp / total, 0).reshape(-1, vbp.shape[2])
+
+    for metrica in METRICAS_CUBO:
+        valores = cubo[metrica].reshape(-1, cubo[metrica].shape[2])
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            log = np.where(valores > 0, np.log(valores), np.nan)
+
+        variacao = np.diff(log, axis=1)
+
+        # Só séries com variações suficientes (safras consecutivas com dados)
+        # para estimar a dispersão
+        com_dados = np.flatnonzero(np.isfinite(variacao).sum(axis=1) >= MINIMO_VARIACOES)
+        valores = valores[com_dados]
+        variacao = variacao[com_dados]
+        z = z_robusto(variacao)
+
+        atipico = (np.nan_to_num(np.abs(z)) > LIMITE_Z_ROBUSTO) & (np.abs(variacao) > np.log(LIMITE_SALTO))
+        relevante = np.maximum(peso[com_dados, :-1], peso[com_dados, 1:]) >= PESO_MINIMO_CULTURA
+        suspeito = atipico & relevante
+        linha, coluna = np.nonzero(suspeito)
+
+        municipio, cultura = np.unravel_index(com_dados[linha], cubo[metrica].shape[:2])
+
+        series.append(
+            pd.DataFrame(
+                {
+                    "Tipo": "Salto",
+                    "Métrica": metrica,
+                    "Município": cubo["municipios"][municipio],
+                    "Cultura": cubo["culturas"][cultura],
+                    "Safra": cubo["safras"][coluna + 1],
+                    "Safra_ordem": cubo["safras_ordem"][coluna + 1],
+                    "Valor anterior": valores[linha, coluna],
+                    "Valor": valores[linha, coluna + 1],
+                    "Variação (x)": np.exp(variacao[linha, coluna]),
+                    "z robusto": z[linha, coluna],
+                }
+            )
+        )
+
+    return pd.concat(series, ignore_index=True)
+
+
+def detectar_mudancas_unidade(cubo: dict, df: pd.DataFrame) -> pd.DataFrame:
+    # Unidade diferente da safra anterior com dados (ou mais de uma unidade
+    # na mesma safra) para cada Município x Cultura, sobre um cubo com o
+    # conjunto de unidades de cada célula em uma máscara de bits
+    base = df.dropna(subset=["Município", "Cultura", "Safra", "Unidade"])
+
+    cod_unidade, unidades = pd.factorize(normalizar_unidade(base["Unidade"]))
+    forma = cubo["VBP"].shape
+
+    if len(unidades) > 63:
+        raise ValueError(f"Unidades demais para a máscara de bits: {len(unidades)}")
+
+    posicao = np.ravel_multi_index(
+        (
+            pd.Index(cubo["municipios"]).get_indexer(base["Município"]),
+            pd.Index(cubo["culturas"]).get_indexer(base["Cultura"]),
+            np.searchsorted(cubo["safras_ordem"], base["Safra_ordem"].to_numpy()),
+        ),
+        forma,
+    )
+
+    mascara = np.zeros(int(np.prod(forma)), dtype=np.int64)
+    np.bitwise_or.at(mascara, posicao, np.left_shift(1, cod_unidade.astype(np.int64)))
+    mascara = mascara.reshape(forma)
+
+    # Índice da safra anterior com dados (propagado ao longo do eixo Safra)
+    safras = np.arange(forma[2])
+    ultima = np.maximum.accumulate(np.where(mascara > 0, safras, -1), axis=2)
+    anterior = np.concatenate([np.full(forma[:2] + (1,), -1), ultima[:, :, :-1]], axis=2)
+
+    mascara_anterior = np.take_along_axis(mascara, np.maximum(anterior, 0), axis=2)
+
+    # Só é mudança quando as duas safras não têm nenhuma unidade em comum;
+    # células com mais de uma unidade já aparecem como "Múltiplas unidades"
+    mudou = (mascara > 0) & (anterior >= 0) & ((mascara & mascara_anterior) == 0)
+    multiplas = np.bitwise_count(mascara) > 1
+
+    nomes = unidades.to_numpy()
+    bits = np.left_shift(1, np.arange(len(nomes), dtype=np.int64))
+
+    def descrever(mascaras: np.ndarray) -> np.ndarray:
+        unicas, inverso = np.unique(mascaras, return_inverse=True)
+        textos = np.array(
+            [", ".join(sorted(nomes[(m & bits) > 0])) for m in unicas],
+            dtype=object,
+        )
+        return textos[inverso]
+
+    m, c, s = np.nonzero(mudou)
+    mudancas = pd.DataFrame(
+        {
+            "Tipo": "Mudança de unidade",
+            "Métrica": "Unidade",
+            "Município": cubo["municipios"][m],
+            "Cultura": cubo["culturas"][c],
+            "Safra": cubo["safras"][s],
+            "Safra_ordem": cubo["safras_ordem"][s],
+            "Unidade anterior": descrever(mascara_anterior[m, c, s]),
+            "Unidade": descrever(mascara[m, c, s]),
+        }
+    )
+
+    m, c, s = np.nonzero(multiplas)
+    repetidas = pd.DataFrame(
+        {
+            "Tipo": "Múltiplas unidades",
+            "Métrica": "Unidade",
+            "Município": cubo["municipios"][m],
+            "Cultura": cubo["culturas"][c],
+            "Safra": cubo["safras"][s],
+            "Safra_ordem": cubo["safras_ordem"][s],
+            "Unidade": descrever(mascara[m, c, s]),
+        }
+    )
+
+    return pd.concat([mudancas, repetidas], ignore_index=True)
+
+
+def detectar_anomalias(cubo: dict, df: pd.DataFrame) -> pd.DataFrame:
+    anomalias = pd.concat(
+        [detectar_saltos(cubo), detectar_mudancas_unidade(cubo, df)],
+        ignore_index=True,
+    )
+
+    return anomalias.sort_values(
+        ["Tipo", "Município", "Cultura", "Safra_ordem"], ignore_index=True
+    )
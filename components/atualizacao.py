@@ -0,0 +1,133 @@
+import hashlib
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from components.analise import (
+    montar_cubo,
+    particionar_culturas,
+    classificar_culturas,
+    montar_hierarquia,
+    montar_regioes,
+    detectar_anomalias,
+)
+from components.consulta import salvar_parquet
+from components.data import PASTA_DADOS, arquivos_dados, carregar_dados
+
+
+INTERVALO_VERIFICACAO = 30  # segundos
+
+logger = logging.getLogger(__name__)
+
+
+def assinatura_dados(pasta: str = PASTA_DADOS) -> str:
+    # Identifica a versão dos dados pelo nome, tamanho e data das planilhas
+    # lidas por carregar_dados
+    arquivos = [
+        (arquivo, os.stat(arquivo).st_size, os.stat(arquivo).st_mtime_ns)
+        for arquivo in arquivos_dados(pasta)
+    ]
+
+    return hashlib.sha1(repr(arquivos).encode()).hexdigest()[:12]
+
+
+def montar_pacote(versao: str, df=None, pasta: str = PASTA_DADOS) -> dict:
+    # Conjunto imutável de dados e agregados de uma versão
+    if df is None:
+        # A leitura das planilhas roda em outro processo para não disputar
+        # o GIL com as sessões que estão sendo atendidas
+        contexto = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=1, mp_context=contexto) as executor:
+            df = executor.submit(carregar_dados, pasta).result()
+
+    cubo = montar_cubo(df)
+
+    return {
+        "versao": versao,
+        "df": df,
+        "cubo": cubo,
+        "culturas": particionar_culturas(df),
+        "hierarquia": montar_hierarquia(cubo, classificar_culturas(df)),
+        "regioes": montar_regioes(cubo, df),
+        "anomalias": detectar_anomalias(cubo, df),
+    }
+
+
+class Repositorio:
+    # Mantém a versão atual dos dados e a troca, em segundo plano, quando as
+    # planilhas de data/ mudam. A troca é uma única atribuição de referência:
+    # cada execução da página lê o pacote uma vez e usa sempre a mesma versão.
+
+    def __init__(self, pasta: str = PASTA_DADOS, intervalo: int = INTERVALO_VERIFICACAO):
+        self.pasta = pasta
+        self.intervalo = intervalo
+        self._pacote = None
+        self._versao_com_falha = None
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def atual(self) -> dict:
+        if self._pacote is None:
+            with self._lock:
+                if self._pacote is None:
+                    versao = assinatura_dados(self.pasta)
+                    self._pacote = montar_pacote(versao, carregar_dados(self.pasta))
+
+        return self._pacote
+
+    def iniciar(self):
+        if self._thread is None:
+            self._thread = threading.Thread(
+                target=self._monitorar,
+                name="atualizacao-dados",
+                daemon=True,
+            )
+            self._thread.start()
+
+    def _monitorar(self):
+        self._salvar_parquet(self.atual())
+        anterior = None
+
+        while True:
+            time.sleep(self.intervalo)
+
+            try:
+                assinatura = assinatura_dados(self.pasta)
+            except OSError:
+                logger.exception("Falha ao verificar a pasta de dados")
+                continue
+
+            atual = self._pacote["versao"] if self._pacote else None
+
+            # Só atualiza quando a assinatura se mantém entre duas verificações
+            # (evita ler planilhas ainda sendo copiadas)
+            if atual and assinatura not in (atual, self._versao_com_falha) and assinatura == anterior:
+                self._atualizar(assinatura)
+
+            anterior = assinatura
+
+    def _atualizar(self, versao: str):
+        logger.info("Atualizando dados para a versão %s", versao)
+
+        try:
+            pacote = montar_pacote(versao, pasta=self.pasta)
+        except Exception:
+            logger.exception("Falha ao atualizar os dados; mantendo a versão atual")
+            self._versao_com_falha = versao
+            return
+
+        with self._lock:
+            self._pacote = pacote
+
+        logger.info("Dados atualizados para a versão %s", versao)
+        self._salvar_parquet(pacote)
+
+    def _salvar_parquet(self, pacote: dict):
+        # Cópia colunar dos dados tratados para o backend SQL opcional
+        try:
+            salvar_parquet(pacote["df"])
+        except Exception:
+            logger.exception("Falha ao gravar o Parquet da versão %s", pacote["versao"])
@@ -0,0 +1,94 @@
+import streamlit as st
+
+from components.analise import (
+    tabela_crescimento,
+    tabela_distribuicao,
+    matriz_perfil,
+    grade_municipio_safra,
+    tabela_hierarquia,
+    tabela_regioes,
+    tabela_participacao,
+)
+from components.atualizacao import Repositorio
+from components.geometria import carregar_malha, malha_disponivel
+
+
+# ===========================================================
+# Salvar Cache dos dados
+# ===========================================================
+# Repositório compartilhado por todas as sessões; atualiza os dados em
+# segundo plano quando as planilhas de data/ mudam
+@st.cache_resource(show_spinner="Carregando dados...")
+def obter_repositorio():
+    repositorio = Repositorio()
+    repositorio.atual()
+    repositorio.iniciar()
+    return repositorio
+
+
+def obter_pacote():
+    return obter_repositorio().atual()
+
+
+# Agregados por versão dos dados (o cubo não entra no hash do cache)
+@st.cache_data(show_spinner=False, max_entries=64)
+def obter_crescimento(_cubo, versao, eixo, safra_inicio, safra_fim):
+    return tabela_crescimento(_cubo, eixo, safra_inicio, safra_fim)
+
+
+@st.cache_data(show_spinner=False, max_entries=64)
+def obter_distribuicao(_cubo, versao, safra_inicio, safra_fim):
+    return tabela_distribuicao(_cubo, safra_inicio, safra_fim)
+
+
+@st.cache_data(show_spinner=False, max_entries=64)
+def obter_perfil(_cubo, versao, safra_inicio, safra_fim):
+    return matriz_perfil(_cubo, safra_inicio, safra_fim)
+
+
+@st.cache_data(show_spinner=False, max_entries=64)
+def obter_grade(_cubo, versao, municipios, safra_inicio, safra_fim):
+    return grade_municipio_safra(_cubo, municipios, safra_inicio, safra_fim)
+
+
+@st.cache_data(show_spinner=False, max_entries=64)
+def obter_hierarquia(_cubo, _hierarquia, versao, municipios, safra_inicio, safra_fim):
+    return tabela_hierarquia(_cubo, _hierarquia, municipios, safra_inicio, safra_fim)
+
+
+@st.cache_data(show_spinner=False, max_entries=64)
+def obter_regioes(_cubo, _regioes, versao, selecionadas, safra_inicio, safra_fim):
+    return tabela_regioes(_cubo, _regioes, selecionadas, safra_inicio, safra_fim)
+
+
+# Poucas entradas: a tabela por cultura tem ~400 mil linhas (~15 MB) por
+# intervalo de safras
+@st.cache_data(show_spinner=False, max_entries=4)
+def obter_participacao(_cubo, versao, safra_inicio, safra_fim):
+    return tabela_participacao(_cubo, safra_inicio, safra_fim)
+
+
+def exportar_participacao(cubo, versao, safra_inicio, safra_fim):
+    # CSVs da participação (resumo e por cultura) de todos os municípios.
+    # Gerados sob demanda e fora do cache (o CSV por cultura passa de 25 MB).
+    resumo, culturas = obter_participacao(cubo, versao, safra_inicio, safra_fim)
+
+    return (
+        resumo.to_csv(index=False, sep=";", encoding="utf-8-sig"),
+        culturas.to_csv(index=False, sep=";", encoding="utf-8-sig"),
+    )
+
+
+# Malha simplificada dos municípios (carregada uma vez por resolução)
+@st.cache_resource(show_spinner="Carregando mapa...")
+def carregar_malha_cache(resolucao):
+    return carregar_malha(resolucao)
+
+
+def obter_malha(resolucao):
+    # A ausência da malha não fica em cache: o arquivo pode ser adicionado
+    # com o app no ar
+    if not malha_disponivel(resolucao):
+        return None
+
+    return carregar_malha_cache(resolucao)
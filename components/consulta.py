@@ -0,0 +1,223 @@
+import os
+from pathlib import Path
+
+import pandas as pd
+
+
+ARQUIVO_PARQUET = Path("data/vbp.parquet")
+
+# Tipos explícitos para o Parquet (as planilhas misturam int, texto e NA)
+TIPOS_PARQUET = {
+    "Código Município": "Int64",
+    "Código Cultura": "Int64",
+    "Município": "string",
+    "Cultura": "string",
+    "Safra": "string",
+    "Grupo": "string",
+    "Subgrupo": "string",
+    "Subg - detalhe\n": "string",
+    "Região": "string",
+    "Unidade": "string",
+}
+
+
+def salvar_parquet(df: pd.DataFrame, caminho: Path = ARQUIVO_PARQUET):
+    # Grava os dados tratados ordenados por safra e município: as estatísticas
+    # de mínimo/máximo de cada row group permitem ao leitor pular blocos
+    # inteiros quando o filtro é por safra ou município.
+    colunas = {coluna: tipo for coluna, tipo in TIPOS_PARQUET.items() if coluna in df.columns}
+
+    tabela = (
+        df.astype(colunas)
+        .sort_values(["Safra_ordem", "Município", "Cultura"])
+        .reset_index(drop=True)
+    )
+
+    temporario = caminho.with_suffix(".parquet.tmp")
+    tabela.to_parquet(temporario, index=False, row_group_size=16384)
+    os.replace(temporario, caminho)
+
+
+class ConsultaPandas:
+    # Agregações do Dashboard sobre o DataFrame em memória
+
+    nome = "pandas"
+
+    def __init__(self, df: pd.DataFrame):
+        self.df = df
+
+    def _filtrar(self, safra_inicio, safra_fim, municipios=None, cultura=None):
+        filtro = self.df["Safra_ordem"].between(safra_inicio, safra_fim)
+
+        if municipios:
+            filtro &= self.df["Município"].isin(municipios)
+        if cultura is not None:
+            filtro &= self.df["Cultura"] == cultura
+
+        return self.df[filtro]
+
+    def total_municipio_safra(self, municipios, safra_inicio, safra_fim) -> pd.DataFrame:
+        return (
+            self._filtrar(safra_inicio, safra_fim, municipios)
+            .groupby(["Município", "Safra", "Safra_ordem"], as_index=False)
+            .agg(
+                {
+                    "VBP": "sum",
+                    "Área (ha)": "sum",
+                    "Cultura": "nunique",
+                }
+            )
+            .rename(columns={"Cultura": "total_culturas"})
+            .sort_values(["Município", "Safra_ordem"], ignore_index=True)
+        )
+
+    def cultura_municipio_safra(self, cultura, municipios, safra_inicio, safra_fim) -> pd.DataFrame:
+        return (
+            self._filtrar(safra_inicio, safra_fim, municipios, cultura)
+            .groupby(["Município", "Safra", "Safra_ordem"], as_index=False)
+            .agg(
+                {
+                    "VBP": "sum",
+                    "Área (ha)": "sum",
+                    "Produção": "sum",
+                    "Abate / Comercialização": "sum",
+                }
+            )
+            .sort_values(["Município", "Safra_ordem"], ignore_index=True)
+        )
+
+    def estatisticas_estado(self, safra_inicio, safra_fim) -> pd.DataFrame:
+        return (
+            self._filtrar(safra_inicio, safra_fim)
+            .groupby(["Safra", "Safra_ordem"], as_index=False)["VBP"]
+            .agg(
+                vbp_medio="mean",
+                vbp_mediana="median",
+                vbp_maximo="max",
+                vbp_desvio_padrao="std",
+            )
+            .sort_values("Safra_ordem", ignore_index=True)
+        )
+
+    def top_culturas(self, metrica, safra_inicio, safra_fim, quantidade=5) -> pd.DataFrame:
+        return (
+            self._filtrar(safra_inicio, safra_fim)
+            .groupby(["Cultura", "Safra", "Safra_ordem"], as_index=False)[metrica]
+            .sum()
+            .sort_values(["Safra_ordem", metrica, "Cultura"], ascending=[True, False, True])
+            .groupby("Safra_ordem")
+            .head(quantidade)
+            .reset_index(drop=True)
+        )
+
+
+class ConsultaDuckDB:
+    # Mesmas agregações em SQL, executadas pelo DuckDB direto sobre o Parquet.
+    # Só as colunas usadas são lidas e os filtros de safra/município/cultura
+    # descem até a leitura do arquivo (projection/predicate pushdown).
+
+    nome = "duckdb"
+
+    def __init__(self, caminho: Path = ARQUIVO_PARQUET):
+        try:
+            import duckdb
+        except ImportError as erro:
+            raise ImportError(
+                "O backend DuckDB é opcional; instale com `pip install duckdb`."
+            ) from erro
+
+        # DDL não aceita parâmetros: o caminho entra como literal SQL escapado
+        literal = Path(caminho).as_posix().replace("'", "''")
+
+        self.conexao = duckdb.connect()
+        self.conexao.execute(f"CREATE VIEW vbp AS SELECT * FROM read_parquet('{literal}')")
+
+    def consultar(self, sql: str, parametros=None) -> pd.DataFrame:
+        # Consultas livres sobre a view `vbp`
+        return self.conexao.execute(sql, parametros or []).df()
+
+    def _filtro(self, safra_inicio, safra_fim, municipios=None, cultura=None):
+        condicoes = ["Safra_ordem BETWEEN ? AND ?"]
+        parametros = [safra_inicio, safra_fim]
+
+        if municipios:
+            condicoes.append(f"Município IN ({', '.join('?' for _ in municipios)})")
+            parametros.extend(municipios)
+        if cultura is not None:
+            condicoes.append("Cultura = ?")
+            parametros.append(cultura)
+
+        return " AND ".join(condicoes), parametros
+
+    def total_municipio_safra(self, municipios, safra_inicio, safra_fim) -> pd.DataFrame:
+        filtro, parametros = self._filtro(safra_inicio, safra_fim, municipios)
+
+        return self.consultar(
+            f"""
+            SELECT Município, Safra, Safra_ordem,
+                   SUM(VBP) AS VBP,
+                   SUM("Área (ha)") AS "Área (ha)",
+                   COUNT(DISTINCT Cultura) AS total_culturas
+            FROM vbp
+            WHERE {filtro}
+            GROUP BY Município, Safra, Safra_ordem
+            ORDER BY Município, Safra_ordem
+            """,
+            parametros,
+        )
+
+    def cultura_municipio_safra(self, cultura, municipios, safra_inicio, safra_fim) -> pd.DataFrame:
+        filtro, parametros = self._filtro(safra_inicio, safra_fim, municipios, cultura)
+
+        return self.consultar(
+            f"""
+            SELECT Município, Safra, Safra_ordem,
+                   SUM(VBP) AS VBP,
+                   SUM("Área (ha)") AS "Área (ha)",
+                   SUM(Produção) AS Produção,
+                   SUM("Abate / Comercialização") AS "Abate / Comercialização"
+            FROM vbp
+            WHERE {filtro}
+            GROUP BY Município, Safra, Safra_ordem
+            ORDER BY Município, Safra_ordem
+            """,
+            parametros,
+        )
+
+    def estatisticas_estado(self, safra_inicio, safra_fim) -> pd.DataFrame:
+        filtro, parametros = self._filtro(safra_inicio, safra_fim)
+
+        return self.consultar(
+            f"""
+            SELECT Safra, Safra_ordem,
+                   AVG(VBP) AS vbp_medio,
+                   MEDIAN(VBP) AS vbp_mediana,
+                   MAX(VBP) AS vbp_maximo,
+                   STDDEV_SAMP(VBP) AS vbp_desvio_padrao
+            FROM vbp
+            WHERE {filtro}
+            GROUP BY Safra, Safra_ordem
+            ORDER BY Safra_ordem
+            """,
+            parametros,
+        )
+
+    def top_culturas(self, metrica, safra_inicio, safra_fim, quantidade=5) -> pd.DataFrame:
+        filtro, parametros = self._filtro(safra_inicio, safra_fim)
+
+        return self.consultar(
+            f"""
+            SELECT Cultura, Safra, Safra_ordem, valor AS "{metrica}"
+            FROM (
+                SELECT Cultura, Safra, Safra_ordem, SUM("{metrica}") AS valor
+                FROM vbp
+                WHERE {filtro}
+                GROUP BY Cultura, Safra, Safra_ordem
+            )
+            QUALIFY ROW_NUMBER() OVER (
+                PARTITION BY Safra_ordem ORDER BY valor DESC, Cultura
+            ) <= ?
+            ORDER BY Safra_ordem, valor DESC, Cultura
+            """,
+            parametros + [quantidade],
+        )
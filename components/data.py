@@ -1,3 +1,4 @@
+import os
 import pandas as pd
 import unicodedata
 from difflib import get_close_matches
@@ -43,6 +44,22 @@ def encontrar_cidade_mais_proxima(cidades, texto_base, cutoff=0.6):
     return []
 
 
+# Grafias da mesma unidade usadas em safras diferentes
+SINONIMOS_UNIDADE = {
+    "T": "TON",
+    "M³": "M3",
+    "M²": "M2",
+    "UN": "UNI",
+    "L": "LIT",
+    "MIL L": "MLT",
+}
+
+
+def normalizar_unidade(unidade: pd.Series) -> pd.Series:
+    unidade = unidade.astype("string").str.strip().str.upper()
+    return unidade.replace(SINONIMOS_UNIDADE)
+
+
 def padronizar_dataframe(df: pd.DataFrame) -> pd.DataFrame:
     df = df.copy()
 
@@ -74,38 +91,23 @@ def padronizar_dataframe(df: pd.DataFrame) -> pd.DataFrame:
     return df[COLUNAS_PADRAO]
 
 
-def carregar_dados() -> pd.DataFrame:
-    # df_2012 = pd.read_excel("data/vbp_2012.xlsx")
-    df_2013 = pd.read_excel("data/vbp_2013.xlsx")
-    df_2014 = pd.read_excel("data/vbp_2014.xlsx")
-
-    df_2015 = pd.read_excel("data/vbp_2015.xlsx")
-    df_2016 = pd.read_excel("data/vbp_2016.xlsx")
-    df_2017 = pd.read_excel("data/vbp_2017.xlsx")
-    df_2018 = pd.read_excel("data/vbp_2018.xlsx")
-
-    df_2019 = pd.read_excel("data/vbp_2019.xlsx")
-    df_2020 = pd.read_excel("data/vbp_2020.xlsx")
-    df_2021 = pd.read_excel("data/vbp_2021.xlsx")
-    df_2022 = pd.read_excel("data/vbp_2022.xlsx")
-    df_2023 = pd.read_excel("data/vbp_2023.xlsx")
-    df_2024 = pd.read_excel("data/vbp_2024.xlsx")
-
-    dfs = [
-        # df_2012,
-        df_2013,
-        df_2014,
-        df_2015,
-        df_2016,
-        df_2017,
-        df_2018,
-        df_2019,
-        df_2020,
-        df_2021,
-        df_2022,
-        df_2023,
-        df_2024,
-    ]
+PASTA_DADOS = "data"
+
+# Planilhas da pasta que ficam fora da carga
+ARQUIVOS_IGNORADOS = {"vbp_2012.xlsx"}
+
+
+def arquivos_dados(pasta: str = PASTA_DADOS) -> list:
+    # Planilhas vbp_<ano>.xlsx da pasta, em ordem de safra
+    return sorted(
+        os.path.join(pasta, nome)
+        for nome in os.listdir(pasta)
+        if nome.startswith("vbp_") and nome.endswith(".xlsx") and nome not in ARQUIVOS_IGNORADOS
+    )
+
+
+def carregar_dados(pasta: str = PASTA_DADOS) -> pd.DataFrame:
+    dfs = [pd.read_excel(arquivo) for arquivo in arquivos_dados(pasta)]
 
     df = pd.concat(
         [padronizar_dataframe(df) for df in dfs],
@@ -145,6 +147,9 @@ def carregar_dados() -> pd.DataFrame:
     df["Município"] = df["Município"].replace("SANTA TEREZINHA DO ITAIPU", "SANTA TEREZINHA DE ITAIPU")
     df["Município"] = df["Município"].replace("SAO JORGE DO OESTE", "SAO JORGE D'OESTE")
     df["Município"] = df["Município"].replace("SAUDADES DO IGUACU", "SAUDADE DO IGUACU")
+    df["Município"] = df["Município"].replace("ARAPUAN", "ARAPUA")
+    df["Município"] = df["Município"].replace("ITAPEJARA DO OESTE", "ITAPEJARA D'OESTE")
+    df["Município"] = df["Município"].replace("PEROLA DO OESTE", "PEROLA D'OESTE")
 
     df["Cultura"] = df["Cultura"].replace("ALHO PORO", "ALHO PORRO")
     df["Cultura"] = df["Cultura"].replace("CRISANTEMO VASO", "CRISANTEMO (VASO)")
@@ -152,6 +157,32 @@ def carregar_dados() -> pd.DataFrame:
     df["Cultura"] = df["Cultura"].replace("CARANGUEIJO", "CARANGUEJO")
     df["Cultura"] = df["Cultura"].replace("MANDIOCA INDUSTRIA", "MANDIOCA INDUSTRIA/CONSUMO ANIMAL")
 
+    # Culturas renomeadas entre safras (mesmo Código Cultura)
+    df["Cultura"] = df["Cultura"].replace("ALGODAO", "ALGODAO (PLUMA)")
+    df["Cultura"] = df["Cultura"].replace("AMENDOIM SAFRA DAS AGUAS", "AMENDOIM (1ª SAFRA)")
+    df["Cultura"] = df["Cultura"].replace("ARROZ SEQUEIRO", "ARROZ DE SEQUEIRO")
+    df["Cultura"] = df["Cultura"].replace("AVEIA PRETA (GRAO)", "AVEIA PRETA")
+    df["Cultura"] = df["Cultura"].replace("BATATA DAS AGUAS", "BATATA (1ª SAFRA)")
+    df["Cultura"] = df["Cultura"].replace("BATATA DA SECA", "BATATA (2ª SAFRA)")
+    df["Cultura"] = df["Cultura"].replace("BICHO DA SEDA (CASULO)", "SERICICULTURA")
+    df["Cultura"] = df["Cultura"].replace("BROCOLOS", "BROCOLIS")
+    df["Cultura"] = df["Cultura"].replace("CRISANTEMO", "CRISANTEMO (MACO)")
+    df["Cultura"] = df["Cultura"].replace("CRISANTEMO - VASO", "CRISANTEMO (VASO)")
+    df["Cultura"] = df["Cultura"].replace("FEIJAO SAFRA DAS AGUAS", "FEIJAO (1ª SAFRA)")
+    df["Cultura"] = df["Cultura"].replace("FEIJAO SAFRA DA SECA", "FEIJAO (2ª SAFRA)")
+    df["Cultura"] = df["Cultura"].replace("FEIJAO SAFRA DE INVERNO", "FEIJAO (3ª SAFRA)")
+    df["Cultura"] = df["Cultura"].replace("MILHO SAFRA NORMAL", "MILHO (1ª SAFRA)")
+    df["Cultura"] = df["Cultura"].replace("MILHO SAFRINHA", "MILHO (2ª SAFRA)")
+    df["Cultura"] = df["Cultura"].replace("SOJA SAFRA NORMAL", "SOJA (1ª SAFRA)")
+    df["Cultura"] = df["Cultura"].replace("SOJA SAFRINHA", "SOJA (2ª SAFRA)")
+    df["Cultura"] = df["Cultura"].replace("SORGO (GRANIFERO)", "SORGO")
+    df["Cultura"] = df["Cultura"].replace("SUINOS < 2 MESES (LEITAO P/RECRIA)", "SUINOS < 2 MESES (LEITAO P/TERMINACAO)")
+    df["Cultura"] = df["Cultura"].replace("SUINOS-RACA (PARA ABATE)", "SUINOS (PARA CORTE)")
+    df["Cultura"] = df["Cultura"].replace("TOMATE SAFRAO", "TOMATE (1ª SAFRA)")
+    df["Cultura"] = df["Cultura"].replace("TOMATE RISCO", "TOMATE (2ª SAFRA)")
+    df["Cultura"] = df["Cultura"].replace("TORA P/ PROCESSO", "MADEIRAS - EM TORA P/PROCESSO - PAINEIS RECONSTITUIDOS")
+    df["Cultura"] = df["Cultura"].replace("UVA VINIFERA", "UVA TRANSFORMACAO")
+
     df = df.drop(columns=["NR", "NR Seab"])
 
     return df
@@ -0,0 +1,210 @@
+import json
+import sys
+from pathlib import Path
+
+import numpy as np
+
+from components.data import remover_acentos
+
+
+PASTA_GEO = Path("data/geo")
+ARQUIVO_ORIGEM = PASTA_GEO / "municipios_pr.geojson"
+
+# Tolerância (graus) e casas decimais de cada resolução pré-simplificada
+RESOLUCOES = {
+    "Baixa": (0.01, 3),
+    "Média": (0.003, 4),
+    "Alta": (0.0008, 5),
+}
+
+# Propriedades usadas como código IBGE do município nas malhas mais comuns
+CHAVES_CODIGO = ["codarea", "CD_MUN", "cod_ibge", "id"]
+
+
+def arquivo_resolucao(resolucao: str) -> Path:
+    return PASTA_GEO / f"municipios_pr_{remover_acentos(resolucao).lower()}.geojson"
+
+
+def codigo_feature(feature: dict):
+    for chave in CHAVES_CODIGO:
+        valor = feature.get("properties", {}).get(chave)
+        if valor is not None:
+            return str(valor)[:7]
+
+    if feature.get("id") is not None:
+        return str(feature["id"])[:7]
+
+    return None
+
+
+def aneis(geometria: dict) -> list:
+    if geometria["type"] == "Polygon":
+        return [geometria["coordinates"]]
+
+    if geometria["type"] == "MultiPolygon":
+        return geometria["coordinates"]
+
+    return []
+
+
+def douglas_peucker(pontos: np.ndarray, tolerancia: float) -> np.ndarray:
+    # Máscara dos pontos mantidos (extremos sempre mantidos)
+    manter = np.zeros(len(pontos), dtype=bool)
+    manter[0] = manter[-1] = True
+
+    pilha = [(0, len(pontos) - 1)]
+
+    while pilha:
+        inicio, fim = pilha.pop()
+
+        if fim - inicio < 2:
+            continue
+
+        a = pontos[inicio]
+        b = pontos[fim]
+        meio = pontos[inicio + 1:fim]
+
+        direcao = b - a
+        comprimento = np.hypot(*direcao)
+
+        if comprimento == 0:
+            distancia = np.hypot(*(meio - a).T)
+        else:
+            relativo = meio - a
+            distancia = np.abs(
+                direcao[0] * relativo[:, 1] - direcao[1] * relativo[:, 0]
+            ) / comprimento
+
+        maior = int(np.argmax(distancia))
+
+        if distancia[maior] > tolerancia:
+            indice = inicio + 1 + maior
+            manter[indice] = True
+            pilha.append((inicio, indice))
+            pilha.append((indice, fim))
+
+    return manter
+
+
+def simplificar(geojson: dict, tolerancia: float, casas: int) -> dict:
+    # Simplificação que preserva a topologia: as fronteiras são quebradas
+    # em arcos entre vértices de junção (onde muda o conjunto de polígonos
+    # vizinhos) e cada arco é simplificado sempre no mesmo sentido, de modo
+    # que municípios vizinhos continuam compartilhando a mesma divisa.
+    poligonos = [
+        [np.asarray(anel, dtype=float)[:-1] for anel in poligono]
+        for feature in geojson["features"]
+        for poligono in aneis(feature["geometry"])
+    ]
+
+    # Conjunto de anéis que contém cada vértice
+    donos = {}
+    for numero, anel in enumerate(a for p in poligonos for a in p):
+        for ponto in map(tuple, anel):
+            donos.setdefault(ponto, set()).add(numero)
+
+    juncoes = set()
+    for anel in (a for p in poligonos for a in p):
+        chaves = list(map(tuple, anel))
+        for i, ponto in enumerate(chaves):
+            if donos[ponto] != donos[chaves[i - 1]] or donos[ponto] != donos[chaves[(i + 1) % len(chaves)]]:
+                juncoes.add(ponto)
+
+    mantidos = set(juncoes)
+
+    for anel in (a for p in poligonos for a in p):
+        chaves = list(map(tuple, anel))
+        cortes = [i for i, ponto in enumerate(chaves) if ponto in juncoes]
+
+        # Anel sem junções (ilha ou enclave): corta no menor vértice, que é o
+        # mesmo para os dois lados da divisa
+        if not cortes:
+            cortes = [chaves.index(min(chaves))]
+            mantidos.add(chaves[cortes[0]])
+
+        for inicio, fim in zip(cortes, cortes[1:] + [cortes[0] + len(chaves)]):
+            indices = [i % len(chaves) for i in range(inicio, fim + 1)]
+            arco = anel[indices]
+
+            # Sentido canônico para que os dois lados da divisa coincidam
+            if tuple(arco[0]) > tuple(arco[-1]) or (
+                tuple(arco[0]) == tuple(arco[-1]) and tuple(arco[1]) > tuple(arco[-2])
+            ):
+                arco = arco[::-1]
+
+            manter = douglas_peucker(arco, tolerancia)
+            mantidos.update(map(tuple, arco[manter]))
+
+    features = []
+    for feature in geojson["features"]:
+        novos_poligonos = []
+
+        for poligono in aneis(feature["geometry"]):
+            novos_aneis = []
+
+            for anel in poligono:
+                pontos = [ponto for ponto in map(tuple, anel[:-1]) if ponto in mantidos]
+
+                if len(pontos) < 3:
+                    continue
+
+                pontos = np.round(pontos, casas).tolist()
+                novos_aneis.append(pontos + [pontos[0]])
+
+            if novos_aneis:
+                novos_poligonos.append(novos_aneis)
+
+        features.append(
+            {
+                "type": "Feature",
+                "id": codigo_feature(feature),
+                "properties": {},
+                "geometry": {
+                    "type": "MultiPolygon",
+                    "coordinates": novos_poligonos,
+                },
+            }
+        )
+
+    return {"type": "FeatureCollection", "features": features}
+
+
+def malha_disponivel(resolucao: str) -> bool:
+    return arquivo_resolucao(resolucao).exists() or ARQUIVO_ORIGEM.exists()
+
+
+def carregar_malha(resolucao: str):
+    # Usa a malha pré-simplificada; sem ela, simplifica a malha original
+    arquivo = arquivo_resolucao(resolucao)
+
+    if arquivo.exists():
+        with open(arquivo, encoding="utf-8") as f:
+            return json.load(f)
+
+    if not ARQUIVO_ORIGEM.exists():
+        return None
+
+    with open(ARQUIVO_ORIGEM, encoding="utf-8") as f:
+        origem = json.load(f)
+
+    tolerancia, casas = RESOLUCOES[resolucao]
+    return simplificar(origem, tolerancia, casas)
+
+
+def gerar_malhas(origem: Path = ARQUIVO_ORIGEM):
+    # Gera antecipadamente as malhas simplificadas de todas as resoluções
+    with open(origem, encoding="utf-8") as f:
+        geojson = json.load(f)
+
+    for resolucao, (tolerancia, casas) in RESOLUCOES.items():
+        malha = simplificar(geojson, tolerancia, casas)
+
+        with open(arquivo_resolucao(resolucao), "w", encoding="utf-8") as f:
+            json.dump(malha, f, separators=(",", ":"))
+
+        print(f"{resolucao}: {arquivo_resolucao(resolucao)}")
+
+
+if __name__ == "__main__":
+    # python -m components.geometria [data/geo/municipios_pr.geojson]
+    gerar_malhas(Path(sys.argv[1]) if len(sys.argv) > 1 else ARQUIVO_ORIGEM)
@@ -1,4 +1,5 @@
 import streamlit as st
+import numpy as np
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
@@ -128,6 +129,70 @@ def geral(df: pd.DataFrame):
         st.plotly_chart(fig, use_container_width=True)
 
 
+def semelhantes(tabela: pd.DataFrame, referencia):
+    if tabela.empty:
+        st.info("Não há municípios semelhantes para exibição.")
+        return
+
+    fig = px.bar(
+        tabela.sort_values("Similaridade"),
+        x="Similaridade",
+        y="Município",
+        orientation="h",
+        title=f"Similaridade da Composição do VBP por Cultura - {referencia}",
+    )
+
+    fig.update_traces(
+        hovertemplate=(
+            "<b>%{y}</b><br>"
+            "Similaridade: %{x:.3f}<extra></extra>"
+        )
+    )
+
+    fig.update_layout(
+        xaxis_title="Similaridade (cosseno)",
+        yaxis_title="Município",
+        xaxis_range=[0, 1],
+    )
+
+    st.plotly_chart(fig, use_container_width=True, key="municipios_semelhantes")
+
+
+def hierarquia(nos: pd.DataFrame, tipo: str = "Treemap"):
+    # Grupo -> Subgrupo -> Cultura; abrir um nó não recalcula nada no servidor
+    if nos.empty:
+        st.info("Não há dados de VBP para a composição por Grupo e Subgrupo.")
+        return
+
+    grafico = go.Sunburst if tipo == "Sunburst" else go.Treemap
+
+    fig = go.Figure(
+        grafico(
+            ids=nos["id"],
+            parents=nos["parent"],
+            labels=nos["label"],
+            values=nos["VBP"],
+            branchvalues="total",
+            maxdepth=2,
+            customdata=nos[["Nível"]],
+            hovertemplate=(
+                "<b>%{label}</b><br>"
+                "%{customdata[0]}<br>"
+                "VBP: R$ %{value:,.2f}<br>"
+                "Participação: %{percentRoot:.2%}<extra></extra>"
+            ),
+        )
+    )
+
+    fig.update_layout(
+        title="VBP por Grupo, Subgrupo e Cultura",
+        height=600,
+        margin=dict(l=0, r=0, t=50, b=0),
+    )
+
+    st.plotly_chart(fig, use_container_width=True, key=f"hierarquia_{tipo}")
+
+
 def cultura(cultura_total: pd.DataFrame, cultura_selecionadas):
     col01, col02 = st.columns(2)
     col03 = st.columns(1)[0]
@@ -244,6 +309,339 @@ def cultura(cultura_total: pd.DataFrame, cultura_selecionadas):
             )
 
 
+def crescimento(serie: pd.DataFrame, periodo: pd.DataFrame, eixo: str, selecionados):
+    # Views de crescimento anual, CAGR e ranking estadual (VBP e Área)
+    if isinstance(selecionados, str):
+        selecionados = [selecionados]
+
+    serie = serie[serie[eixo].isin(selecionados)].sort_values("Safra_ordem")
+    periodo = periodo[periodo[eixo].isin(selecionados)]
+
+    if serie.empty:
+        st.info("Não há dados de crescimento para exibição.")
+        return
+
+    col01, col02 = st.columns(2)
+    col03, col04 = st.columns(2)
+
+    with col01:
+        fig = px.line(
+            serie,
+            x="Safra",
+            y="VBP - Crescimento (%)",
+            color=eixo,
+            markers=True,
+            title="Crescimento Anual do VBP (%)",
+            custom_data=[eixo],
+        )
+
+        fig.update_traces(
+            hovertemplate=(
+                "<b>%{customdata[0]}</b><br>"
+                "Safra: %{x}<br>"
+                "Crescimento: %{y:,.2f}%<extra></extra>"
+            )
+        )
+
+        fig.update_layout(
+            xaxis_title="Safra",
+            yaxis_title="Crescimento (%)",
+            legend_title_text=eixo,
+        )
+
+        st.plotly_chart(fig, use_container_width=True, key=f"crescimento_vbp_{eixo}")
+
+    with col02:
+        df_plot = periodo.melt(
+            id_vars=eixo,
+            value_vars=["VBP - CAGR (%)", "Área (ha) - CAGR (%)"],
+            var_name="Indicador",
+            value_name="CAGR (%)",
+        )
+
+        if df_plot["CAGR (%)"].notna().any():
+            fig = px.bar(
+                df_plot,
+                x=eixo,
+                y="CAGR (%)",
+                color="Indicador",
+                barmode="group",
+                title="CAGR no Período Selecionado (%)",
+            )
+
+            fig.update_traces(
+                hovertemplate=(
+                    "<b>%{x}</b><br>"
+                    "CAGR: %{y:,.2f}%<extra></extra>"
+                )
+            )
+
+            fig.update_layout(
+                xaxis_title=eixo,
+                yaxis_title="CAGR (%)",
+            )
+
+            st.plotly_chart(fig, use_container_width=True, key=f"cagr_{eixo}")
+        else:
+            st.info("Não há dados suficientes para o CAGR.")
+
+    with col03:
+        fig = px.line(
+            serie,
+            x="Safra",
+            y="VBP - Ranking",
+            color=eixo,
+            markers=True,
+            title="Ranking Estadual por VBP",
+            custom_data=[eixo, "VBP - Percentil"],
+        )
+
+        fig.update_traces(
+            hovertemplate=(
+                "<b>%{customdata[0]}</b><br>"
+                "Safra: %{x}<br>"
+                "Posição: %{y:.0f}º<br>"
+                "Percentil: %{customdata[1]:.1f}<extra></extra>"
+            )
+        )
+
+        fig.update_layout(
+            xaxis_title="Safra",
+            yaxis_title="Posição",
+            yaxis_autorange="reversed",
+            legend_title_text=eixo,
+        )
+
+        st.plotly_chart(fig, use_container_width=True, key=f"ranking_vbp_{eixo}")
+
+    with col04:
+        fig = px.line(
+            serie,
+            x="Safra",
+            y="Área (ha) - Ranking",
+            color=eixo,
+            markers=True,
+            title="Ranking Estadual por Área (ha)",
+            custom_data=[eixo, "Área (ha) - Percentil"],
+        )
+
+        fig.update_traces(
+            hovertemplate=(
+                "<b>%{customdata[0]}</b><br>"
+                "Safra: %{x}<br>"
+                "Posição: %{y:.0f}º<br>"
+                "Percentil: %{customdata[1]:.1f}<extra></extra>"
+            )
+        )
+
+        fig.update_layout(
+            xaxis_title="Safra",
+            yaxis_title="Posição",
+            yaxis_autorange="reversed",
+            legend_title_text=eixo,
+        )
+
+        st.plotly_chart(fig, use_container_width=True, key=f"ranking_area_{eixo}")
+
+
+def regiao(tabela: pd.DataFrame):
+    if tabela.empty:
+        st.info("Não há dados regionais para exibição.")
+        return
+
+    col01, col02 = st.columns(2)
+    col03, col04 = st.columns(2)
+
+    tabela = tabela.sort_values("Safra_ordem")
+
+    with col01:
+        fig = px.bar(
+            tabela,
+            x="Safra",
+            y="VBP",
+            color="Região",
+            title="VBP Total por Região e Safra",
+            barmode="group",
+            custom_data=["Região", "total_municipios"],
+        )
+
+        fig.update_traces(
+            hovertemplate=(
+                "<b>%{customdata[0]}</b><br>"
+                "Safra: %{x}<br>"
+                "Municípios: %{customdata[1]}<br>"
+                "VBP: %{y:,.2f}<extra></extra>"
+            )
+        )
+
+        fig.update_layout(
+            xaxis_title="Safra",
+            yaxis_title="VBP",
+            legend_title_text="Região",
+        )
+
+        st.plotly_chart(fig, use_container_width=True, key="regiao_vbp")
+
+    with col02:
+        fig = px.line(
+            tabela,
+            x="Safra",
+            y="Participação no Estado (%)",
+            color="Região",
+            markers=True,
+            title="Participação no VBP Estadual (%)",
+            custom_data=["Região"],
+        )
+
+        fig.update_traces(
+            hovertemplate=(
+                "<b>%{customdata[0]}</b><br>"
+                "Safra: %{x}<br>"
+                "Participação: %{y:.2f}%<extra></extra>"
+            )
+        )
+
+        fig.update_layout(
+            xaxis_title="Safra",
+            yaxis_title="Participação (%)",
+            legend_title_text="Região",
+        )
+
+        st.plotly_chart(fig, use_container_width=True, key="regiao_participacao")
+
+    with col03:
+        fig = px.line(
+            tabela,
+            x="Safra",
+            y="Área (ha)",
+            color="Região",
+            markers=True,
+            title="Área (ha) Total por Região e Safra",
+            custom_data=["Região"],
+        )
+
+        fig.update_traces(
+            hovertemplate=(
+                "<b>%{customdata[0]}</b><br>"
+                "Safra: %{x}<br>"
+                "Área (ha): %{y:,.2f}<extra></extra>"
+            )
+        )
+
+        fig.update_layout(
+            xaxis_title="Safra",
+            yaxis_title="Área (ha)",
+            legend_title_text="Região",
+        )
+
+        st.plotly_chart(fig, use_container_width=True, key="regiao_area")
+
+    with col04:
+        fig = px.line(
+            tabela,
+            x="Safra",
+            y="total_culturas",
+            color="Região",
+            markers=True,
+            title="Culturas por Região e Safra",
+            custom_data=["Região"],
+        )
+
+        fig.update_traces(
+            hovertemplate=(
+                "<b>%{customdata[0]}</b><br>"
+                "Safra: %{x}<br>"
+                "Total de Culturas: %{y}<extra></extra>"
+            )
+        )
+
+        fig.update_layout(
+            xaxis_title="Safra",
+            yaxis_title="Total de Culturas",
+            legend_title_text="Região",
+        )
+
+        st.plotly_chart(fig, use_container_width=True, key="regiao_culturas")
+
+
+def participacao(resumo: pd.DataFrame, culturas: pd.DataFrame, selecionados):
+    resumo = resumo[resumo["Município"].isin(selecionados)].sort_values("Safra_ordem")
+    culturas = culturas[culturas["Município"].isin(selecionados)]
+
+    if resumo.empty:
+        st.info("Não há dados de participação para exibição.")
+        return
+
+    col01, col02 = st.columns(2)
+
+    with col01:
+        fig = px.line(
+            resumo,
+            x="Safra",
+            y="Participação (%)",
+            color="Município",
+            markers=True,
+            title="Participação no VBP Estadual (%)",
+            custom_data=["Município", "Variação (p.p.)"],
+        )
+
+        fig.update_traces(
+            hovertemplate=(
+                "<b>%{customdata[0]}</b><br>"
+                "Safra: %{x}<br>"
+                "Participação: %{y:.4f}%<br>"
+                "Variação: %{customdata[1]:+.4f} p.p.<extra></extra>"
+            )
+        )
+
+        fig.update_layout(
+            xaxis_title="Safra",
+            yaxis_title="Participação (%)",
+            legend_title_text="Município",
+        )
+
+        st.plotly_chart(fig, use_container_width=True, key="participacao_estadual")
+
+    with col02:
+        ultima = culturas["Safra_ordem"].max()
+        df_plot = (
+            culturas[culturas["Safra_ordem"] == ultima]
+            .sort_values("Contribuição (p.p.)", ascending=False)
+            .groupby("Município")
+            .head(10)
+        )
+
+        if not df_plot.empty:
+            fig = px.bar(
+                df_plot,
+                x="Contribuição (p.p.)",
+                y="Cultura",
+                color="Município",
+                orientation="h",
+                barmode="group",
+                title=f"Contribuição das Culturas na Participação - Safra {df_plot['Safra'].iloc[0]}",
+                custom_data=["Município"],
+            )
+
+            fig.update_traces(
+                hovertemplate=(
+                    "<b>%{customdata[0]}</b><br>"
+                    "%{y}<br>"
+                    "Contribuição: %{x:.4f} p.p.<extra></extra>"
+                )
+            )
+
+            fig.update_layout(
+                xaxis_title="Contribuição (p.p.)",
+                yaxis_title="Cultura",
+                yaxis=dict(categoryorder="total ascending"),
+            )
+
+            st.plotly_chart(fig, use_container_width=True, key="participacao_culturas")
+        else:
+            st.info("Não há contribuição por cultura para exibição.")
+
+
 def estado(df: pd.DataFrame):
 
     col01, col02 = st.columns(2)
@@ -416,6 +814,220 @@ def estado(df: pd.DataFrame):
             st.info("Não há dados de Área para Top 5 Culturas.")
 
 
+def distribuicao(tabela: pd.DataFrame):
+    # Faixas de percentis e concentração do VBP por safra
+    col01, col02 = st.columns(2)
+    col03 = st.columns(1)[0]
+
+    municipios = tabela[tabela["Nível"] == "Município"].sort_values("Safra_ordem")
+
+    with col01:
+        if not municipios.empty and municipios["Mediana"].notna().any():
+            fig = go.Figure()
+
+            # Faixa P10 - P90
+            fig.add_trace(
+                go.Scatter(
+                    x=municipios["Safra"],
+                    y=municipios["P90"],
+                    mode="lines",
+                    line=dict(width=0),
+                    showlegend=False,
+                    hoverinfo="skip",
+                )
+            )
+            fig.add_trace(
+                go.Scatter(
+                    x=municipios["Safra"],
+                    y=municipios["P10"],
+                    mode="lines",
+                    line=dict(width=0),
+                    fill="tonexty",
+                    fillcolor="rgba(99, 110, 250, 0.15)",
+                    name="P10 - P90",
+                    customdata=municipios[["P10", "P90"]],
+                    hovertemplate="P10 - P90<br>R$ %{customdata[0]:,.2f} - R$ %{customdata[1]:,.2f}<extra></extra>",
+                )
+            )
+
+            # Faixa P25 - P75
+            fig.add_trace(
+                go.Scatter(
+                    x=municipios["Safra"],
+                    y=municipios["P75"],
+                    mode="lines",
+                    line=dict(width=0),
+                    showlegend=False,
+                    hoverinfo="skip",
+                )
+            )
+            fig.add_trace(
+                go.Scatter(
+                    x=municipios["Safra"],
+                    y=municipios["P25"],
+                    mode="lines",
+                    line=dict(width=0),
+                    fill="tonexty",
+                    fillcolor="rgba(99, 110, 250, 0.35)",
+                    name="P25 - P75",
+                    customdata=municipios[["P25", "P75"]],
+                    hovertemplate="P25 - P75<br>R$ %{customdata[0]:,.2f} - R$ %{customdata[1]:,.2f}<extra></extra>",
+                )
+            )
+
+            # Mediana
+            fig.add_trace(
+                go.Scatter(
+                    x=municipios["Safra"],
+                    y=municipios["Mediana"],
+                    mode="lines+markers",
+                    name="Mediana",
+                    hovertemplate="Mediana<br>R$ %{y:,.2f}<extra></extra>",
+                )
+            )
+
+            fig.update_layout(
+                title="Faixas de Percentis do VBP Municipal por Safra",
+                xaxis_title="Safra",
+                yaxis=dict(
+                    title="VBP (R$)",
+                    tickprefix="R$ ",
+                ),
+                legend_title_text="Percentis",
+                hovermode="x unified",
+            )
+
+            st.plotly_chart(fig, use_container_width=True, key="percentis_vbp")
+        else:
+            st.info("Não há dados de VBP para as faixas de percentis.")
+
+    with col02:
+        if not tabela.empty and tabela["Gini"].notna().any():
+            fig = px.line(
+                tabela.sort_values("Safra_ordem"),
+                x="Safra",
+                y="Gini",
+                color="Nível",
+                markers=True,
+                title="Índice de Gini do VBP por Safra",
+                custom_data=["Nível", "HHI"],
+            )
+
+            fig.update_traces(
+                hovertemplate=(
+                    "<b>%{customdata[0]}</b><br>"
+                    "Gini: %{y:.3f}<br>"
+                    "HHI: %{customdata[1]:,.0f}<extra></extra>"
+                )
+            )
+
+            fig.update_layout(
+                xaxis_title="Safra",
+                yaxis_title="Gini",
+                legend_title_text="Concentração entre",
+                hovermode="x unified",
+            )
+
+            st.plotly_chart(fig, use_container_width=True, key="gini_vbp")
+        else:
+            st.info("Não há dados de VBP para o índice de Gini.")
+
+    with col03:
+        coluna_top = [coluna for coluna in tabela.columns if coluna.startswith("Top ")]
+
+        if coluna_top and tabela[coluna_top[0]].notna().any():
+            fig = px.bar(
+                tabela.sort_values("Safra_ordem"),
+                x="Safra",
+                y=coluna_top[0],
+                color="Nível",
+                barmode="group",
+                title=f"Participação dos {coluna_top[0].replace(' (%)', '')} no VBP Estadual",
+                custom_data=["Nível"],
+            )
+
+            fig.update_traces(
+                hovertemplate=(
+                    "<b>%{customdata[0]}</b><br>"
+                    "Safra: %{x}<br>"
+                    "Participação: %{y:.2f}%<extra></extra>"
+                )
+            )
+
+            fig.update_layout(
+                xaxis_title="Safra",
+                yaxis_title="Participação (%)",
+                legend_title_text="Nível",
+            )
+
+            st.plotly_chart(fig, use_container_width=True, key="top_k_vbp")
+        else:
+            st.info("Não há dados de VBP para a participação do Top.")
+
+
+def mapa(malha: dict, codigos, safras, matriz, metrica: str):
+    # A malha vai uma única vez para o navegador; cada safra é um frame
+    # que troca apenas o vetor de valores (z) do choropleth.
+    if matriz.size == 0 or not (matriz > 0).any():
+        st.info(f"Não há dados de {metrica} para o mapa.")
+        return
+
+    zmax = float(np.nanpercentile(matriz[matriz > 0], 95))
+
+    fig = go.Figure(
+        data=[
+            go.Choropleth(
+                geojson=malha,
+                locations=codigos,
+                z=matriz[-1],
+                zmin=0,
+                zmax=zmax,
+                colorscale="Greens",
+                marker_line_width=0.3,
+                colorbar_title=metrica,
+                hovertemplate=(
+                    "Código: %{location}<br>"
+                    f"{metrica}: %{{z:,.2f}}<extra></extra>"
+                ),
+            )
+        ],
+        frames=[
+            go.Frame(data=[go.Choropleth(z=valores)], name=str(safra))
+            for safra, valores in zip(safras, matriz)
+        ],
+    )
+
+    fig.update_geos(
+        fitbounds="locations",
+        visible=False,
+    )
+
+    fig.update_layout(
+        title=f"{metrica} por Município",
+        height=600,
+        margin=dict(l=0, r=0, t=50, b=0),
+        sliders=[
+            dict(
+                active=len(safras) - 1,
+                currentvalue=dict(prefix="Safra: "),
+                steps=[
+                    dict(
+                        label=str(safra),
+                        method="animate",
+                        args=[
+                            [str(safra)],
+                            dict(mode="immediate", frame=dict(duration=0, redraw=True)),
+                        ],
+                    )
+                    for safra in safras
+                ],
+            )
+        ],
+    )
+
+    st.plotly_chart(fig, use_container_width=True, key=f"mapa_{metrica}")
+
+
 def indicadores():
 
     col1, col2 = st.columns(2)
@@ -494,6 +1106,45 @@ def indicadores():
             """
         )
 
+    col5, col6 = st.columns(2)
+
+    # =========================
+    # PERCENTIS
+    # =========================
+    with col5:
+        st.markdown("### 🔹 Percentis (P10, P25, P75, P90)")
+        st.markdown(
+            "Valor abaixo do qual está uma fração $p$ dos municípios."
+        )
+        st.latex(
+            r"P_p = VBP_{(k)} + f \cdot (VBP_{(k+1)} - VBP_{(k)}),\; k + f = p \cdot (n - 1)"
+        )
+        st.markdown(
+            "📌 A faixa P25–P75 concentra a metade central dos municípios."
+        )
+
+    # =========================
+    # CONCENTRAÇÃO
+    # =========================
+    with col6:
+        st.markdown("### 🔹 Gini e HHI")
+        st.markdown(
+            "Medem o quanto o VBP está concentrado em poucos municípios ou culturas."
+        )
+        st.latex(
+            r"G = \frac{2 \sum_{i=1}^{n} i \, VBP_{(i)}}{n \sum_{i=1}^{n} VBP_{(i)}} - \frac{n + 1}{n}"
+        )
+        st.latex(
+            r"HHI = 10000 \sum_{i=1}^{n} s_i^2, \quad s_i = \frac{VBP_i}{\sum VBP}"
+        )
+        st.markdown(
+            """
+            📌 Interpretação:
+            - Gini próximo de 0 → distribuição igualitária
+            - HHI > 2500 → alta concentração
+            """
+        )
+
     st.markdown("---")
 
     st.info(
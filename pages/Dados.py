@@ -1,6 +1,6 @@
 import streamlit as st
 import pandas as pd
-from pages.Dashboard import obter_dados
+from components.cache import obter_pacote
 from components.graficos import rodape
 
 # Configuração da página
@@ -11,7 +11,9 @@ st.set_page_config(
 )
 
 
-df = obter_dados()
+pacote = obter_pacote()
+df = pacote["df"]
+anomalias = pacote["anomalias"]
 
 safra = (df["Safra"].dropna().astype(str).sort_values().unique())
 cultura = (df["Cultura"].dropna().astype(str).sort_values().unique())
@@ -62,17 +64,79 @@ codigo = """
     df["Município"] = df["Município"].replace("SANTA TEREZINHA DO ITAIPU", "SANTA TEREZINHA DE ITAIPU")
     df["Município"] = df["Município"].replace("SAO JORGE DO OESTE", "SAO JORGE D'OESTE")
     df["Município"] = df["Município"].replace("SAUDADES DO IGUACU", "SAUDADE DO IGUACU")
+    df["Município"] = df["Município"].replace("ARAPUAN", "ARAPUA")
+    df["Município"] = df["Município"].replace("ITAPEJARA DO OESTE", "ITAPEJARA D'OESTE")
+    df["Município"] = df["Município"].replace("PEROLA DO OESTE", "PEROLA D'OESTE")
 
     df["Cultura"] = df["Cultura"].replace("ALHO PORO", "ALHO PORRO")
     df["Cultura"] = df["Cultura"].replace("CRISANTEMO VASO", "CRISANTEMO (VASO)")
     df["Cultura"] = df["Cultura"].replace("MANDIOCA CONSUMO HUMANO", "MANDIOCA CONSUMO (HUMANO)")
     df["Cultura"] = df["Cultura"].replace("CARANGUEIJO", "CARANGUEJO")
     df["Cultura"] = df["Cultura"].replace("MANDIOCA INDUSTRIA", "MANDIOCA INDUSTRIA/CONSUMO ANIMAL")
+
+    # Culturas renomeadas entre safras (mesmo Código Cultura)
+    df["Cultura"] = df["Cultura"].replace("ALGODAO", "ALGODAO (PLUMA)")
+    df["Cultura"] = df["Cultura"].replace("AMENDOIM SAFRA DAS AGUAS", "AMENDOIM (1ª SAFRA)")
+    df["Cultura"] = df["Cultura"].replace("ARROZ SEQUEIRO", "ARROZ DE SEQUEIRO")
+    df["Cultura"] = df["Cultura"].replace("AVEIA PRETA (GRAO)", "AVEIA PRETA")
+    df["Cultura"] = df["Cultura"].replace("BATATA DAS AGUAS", "BATATA (1ª SAFRA)")
+    df["Cultura"] = df["Cultura"].replace("BATATA DA SECA", "BATATA (2ª SAFRA)")
+    df["Cultura"] = df["Cultura"].replace("BICHO DA SEDA (CASULO)", "SERICICULTURA")
+    df["Cultura"] = df["Cultura"].replace("BROCOLOS", "BROCOLIS")
+    df["Cultura"] = df["Cultura"].replace("CRISANTEMO", "CRISANTEMO (MACO)")
+    df["Cultura"] = df["Cultura"].replace("CRISANTEMO - VASO", "CRISANTEMO (VASO)")
+    df["Cultura"] = df["Cultura"].replace("FEIJAO SAFRA DAS AGUAS", "FEIJAO (1ª SAFRA)")
+    df["Cultura"] = df["Cultura"].replace("FEIJAO SAFRA DA SECA", "FEIJAO (2ª SAFRA)")
+    df["Cultura"] = df["Cultura"].replace("FEIJAO SAFRA DE INVERNO", "FEIJAO (3ª SAFRA)")
+    df["Cultura"] = df["Cultura"].replace("MILHO SAFRA NORMAL", "MILHO (1ª SAFRA)")
+    df["Cultura"] = df["Cultura"].replace("MILHO SAFRINHA", "MILHO (2ª SAFRA)")
+    df["Cultura"] = df["Cultura"].replace("SOJA SAFRA NORMAL", "SOJA (1ª SAFRA)")
+    df["Cultura"] = df["Cultura"].replace("SOJA SAFRINHA", "SOJA (2ª SAFRA)")
+    df["Cultura"] = df["Cultura"].replace("SORGO (GRANIFERO)", "SORGO")
+    df["Cultura"] = df["Cultura"].replace("SUINOS < 2 MESES (LEITAO P/RECRIA)", "SUINOS < 2 MESES (LEITAO P/TERMINACAO)")
+    df["Cultura"] = df["Cultura"].replace("SUINOS-RACA (PARA ABATE)", "SUINOS (PARA CORTE)")
+    df["Cultura"] = df["Cultura"].replace("TOMATE SAFRAO", "TOMATE (1ª SAFRA)")
+    df["Cultura"] = df["Cultura"].replace("TOMATE RISCO", "TOMATE (2ª SAFRA)")
+    df["Cultura"] = df["Cultura"].replace("TORA P/ PROCESSO", "MADEIRAS - EM TORA P/PROCESSO - PAINEIS RECONSTITUIDOS")
+    df["Cultura"] = df["Cultura"].replace("UVA VINIFERA", "UVA TRANSFORMACAO")
 """
 
 st.code(codigo, language="python")
 
 
+st.subheader("Possíveis Inconsistências", divider=True)
+
+st.markdown(
+    "Saltos atípicos entre safras consecutivas (z-score robusto com mediana/MAD da variação "
+    "de cada série Município x Cultura, só em culturas com ao menos 1% do VBP do município) "
+    "e mudanças de unidade, calculados na carga dos dados."
+)
+
+contagem = anomalias["Tipo"].value_counts()
+col7, col8, col9 = st.columns(3)
+col7.metric("Saltos", contagem.get("Salto", 0))
+col8.metric("Mudanças de Unidade", contagem.get("Mudança de unidade", 0))
+col9.metric("Múltiplas Unidades", contagem.get("Múltiplas unidades", 0))
+
+if anomalias.empty:
+    st.info("Nenhuma inconsistência encontrada nesta versão dos dados.")
+else:
+    tipo_anomalia = st.selectbox("Tipo:", options=sorted(anomalias["Tipo"].unique()))
+    df_anomalias = anomalias[anomalias["Tipo"] == tipo_anomalia].dropna(axis=1, how="all")
+
+    if "z robusto" in df_anomalias.columns:
+        df_anomalias = df_anomalias.sort_values("z robusto", key=abs, ascending=False)
+
+    st.dataframe(df_anomalias.drop(columns=["Safra_ordem"], errors="ignore"), hide_index=True)
+
+    st.download_button(
+        label="📥 Exportar Inconsistências",
+        data=anomalias.to_csv(index=False, sep=";", encoding="utf-8-sig"),
+        file_name="Inconsistencias-VBP.csv",
+        mime="text/csv",
+    )
+
+
 st.subheader("Municípios", divider=True)
 df_municipio = pd.DataFrame(municipio, columns=["Município"])
 st.dataframe(df_municipio)
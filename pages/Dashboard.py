@@ -1,6 +1,20 @@
 import streamlit as st
-from components.data import carregar_dados, encontrar_cidade_mais_proxima
-from components.graficos import geral, estado, rodape, cultura, indicadores
+from components.data import encontrar_cidade_mais_proxima
+from components.graficos import geral, estado, rodape, cultura, indicadores, crescimento, distribuicao, semelhantes, mapa, hierarquia, regiao, participacao
+from components.analise import municipios_semelhantes, valores_mapa, dados_cultura
+from components.geometria import RESOLUCOES
+from components.cache import (
+    obter_pacote,
+    obter_crescimento,
+    obter_distribuicao,
+    obter_perfil,
+    obter_grade,
+    obter_malha,
+    obter_hierarquia,
+    obter_regioes,
+    obter_participacao,
+    exportar_participacao,
+)
 
 
 # ===========================================================
@@ -13,16 +27,22 @@ st.set_page_config(
 )
 
 
-# ===========================================================
-# Salvar Cache dos dados
-# ===========================================================
-@st.cache_data(show_spinner="Carregando dados...")
-def obter_dados():
-    return carregar_dados()
+def adicionar_semelhantes(tabela):
+    # Preenche o multiselect com a referência e os municípios semelhantes
+    referencia = st.session_state["municipio_referencia"]
+    st.session_state["cidades_selecionadas"] = [referencia] + tabela["Município"].tolist()
+
 
+# Carregar dados (uma única versão durante toda a execução da página)
+pacote = obter_pacote()
+df = pacote["df"]
+cubo = pacote["cubo"]
+versao = pacote["versao"]
 
-# Carregar dados
-df = obter_dados()
+if st.session_state.get("versao_dados", versao) != versao:
+    st.toast("Os dados foram atualizados.", icon="🔄")
+
+st.session_state["versao_dados"] = versao
 
 cidade = (df["Município"].dropna().astype(str).sort_values().unique())
 culturas = (df["Cultura"].dropna().astype(str).sort_values().unique())
@@ -48,13 +68,38 @@ safra_inicio, safra_fim = st.sidebar.select_slider(
     "Selecione as Safras:",
     options=safras,
     value=(safras[0], safras[-1]),
+    key="safras_selecionadas",
 )
 
 safra_inicio = int(str(safra_inicio).replace("/", "").replace("-", ""))
 safra_fim = int(str(safra_fim).replace("/", "").replace("-", ""))
 
-cidade_default = encontrar_cidade_mais_proxima(cidade, "CENTENARIO DO SUL")
-cidades_selecionadas = st.sidebar.multiselect("Selecione o(s) Município(s):", options=sorted(cidade), default=cidade_default)
+if "cidades_selecionadas" not in st.session_state:
+    st.session_state["cidades_selecionadas"] = encontrar_cidade_mais_proxima(cidade, "CENTENARIO DO SUL")
+
+cidades_selecionadas = st.sidebar.multiselect("Selecione o(s) Município(s):", options=sorted(cidade), key="cidades_selecionadas")
+
+# Municípios semelhantes pela composição do VBP por Cultura
+municipio_referencia = st.sidebar.selectbox(
+    "Municípios semelhantes a:",
+    options=sorted(cidade),
+    index=None,
+    placeholder="Escolha um município",
+    key="municipio_referencia",
+)
+
+if municipio_referencia:
+    tabela_semelhantes = municipios_semelhantes(
+        cubo,
+        obter_perfil(cubo, versao, safra_inicio, safra_fim),
+        municipio_referencia,
+    )
+
+    st.sidebar.button(
+        "Comparar com os semelhantes",
+        on_click=adicionar_semelhantes,
+        args=(tabela_semelhantes,),
+    )
 
 if cidades_selecionadas:
     df_filtrado = df[df["Município"].isin(cidades_selecionadas) & df["Safra_ordem"].between(safra_inicio, safra_fim)]
@@ -64,6 +109,35 @@ else:
 
 geral(df_filtrado)
 
+if municipio_referencia:
+    st.subheader(f"Municípios Semelhantes a {municipio_referencia}", divider=True)
+    semelhantes(tabela_semelhantes, municipio_referencia)
+
+st.subheader("Crescimento e Ranking por Município", divider=True)
+
+if cidades_selecionadas:
+    serie_municipio, periodo_municipio = obter_crescimento(cubo, versao, "Município", safra_inicio, safra_fim)
+    crescimento(serie_municipio, periodo_municipio, "Município", cidades_selecionadas)
+else:
+    st.info("Selecione ao menos um município para ver o crescimento e o ranking.")
+
+
+# ===========================================================
+# GRUPO / SUBGRUPO
+# ===========================================================
+st.subheader("Composição do VBP por Grupo e Subgrupo", divider=True)
+
+tipo_hierarquia = st.radio("Visualização:", options=["Treemap", "Sunburst"], horizontal=True)
+
+nos_hierarquia = obter_hierarquia(
+    cubo,
+    pacote["hierarquia"],
+    versao,
+    tuple(cidades_selecionadas),
+    safra_inicio,
+    safra_fim,
+)
+hierarquia(nos_hierarquia, tipo_hierarquia)
 
 # ===========================================================
 # CULTURA
@@ -73,68 +147,94 @@ st.subheader("Produção por Cultura", divider=True)
 cultura_selecionadas = st.sidebar.selectbox(
     "Selecione a Cultura:",
     options=sorted(culturas),
+    key="cultura_selecionada",
 )
 
-# Base completa
-df_base = df_filtrado.copy()
+# Grade densa Município x Safra da seleção atual; sem municípios
+# selecionados, considera o estado inteiro em todas as safras
+if cidades_selecionadas:
+    grade = obter_grade(cubo, versao, tuple(cidades_selecionadas), safra_inicio, safra_fim)
+else:
+    grade = obter_grade(cubo, versao, tuple(cubo["municipios"]), cubo["safras_ordem"][0], cubo["safras_ordem"][-1])
 
-# Filtra apenas a cultura selecionada
-df_cultura = df_base[df_base["Cultura"] == cultura_selecionadas]
+# Partição pré-calculada da cultura reindexada na grade
+cultura_total, medida, outras_unidades = dados_cultura(cubo, pacote["culturas"], cultura_selecionadas, grade)
 
-# Agrega a cultura por município e safra
-cultura_agregada = (
-    df_cultura.groupby(
-        ["Município", "Safra", "Safra_ordem", "Unidade"],
-        as_index=False,
-    )
-    .agg(
-        {
-            "VBP": "sum",
-            "Área (ha)": "sum",
-            "Produção": "sum",
-            "Abate / Comercialização": "sum",
-        }
+st.text(f"Cultura: {cultura_selecionadas}, Medida: {medida}")
+
+if outras_unidades:
+    st.caption(
+        f"Também registrada em {', '.join(outras_unidades)}; "
+        f"a Produção considera apenas os registros em {medida}."
     )
-)
 
-# Base com TODAS as combinações de município e safra
-base_completa = (
-    df_base[["Município", "Safra", "Safra_ordem"]]
-    .drop_duplicates()
-)
+# Envia para o componente/gráfico
+cultura(cultura_total, cultura_selecionadas)
 
-# Junta base completa com a cultura agregada
-cultura_total = base_completa.merge(
-    cultura_agregada,
-    on=["Município", "Safra", "Safra_ordem"],
-    how="left",
-)
+st.subheader("Crescimento e Ranking da Cultura", divider=True)
 
-# Preenche valores ausentes com zero
-colunas_zero = [
-    "VBP",
-    "Área (ha)",
-    "Produção",
-    "Abate / Comercialização",
-]
+serie_cultura, periodo_cultura = obter_crescimento(cubo, versao, "Cultura", safra_inicio, safra_fim)
+crescimento(serie_cultura, periodo_cultura, "Cultura", cultura_selecionadas)
 
-cultura_total[colunas_zero] = cultura_total[colunas_zero].fillna(0)
 
-# Preenche informações fixas
-cultura_total["Cultura"] = cultura_selecionadas
+# ===========================================================
+# PARTICIPAÇÃO (ICMS)
+# ===========================================================
+st.subheader("Participação no VBP Estadual (ICMS)", divider=True)
 
-medida = (
-    df_cultura["Unidade"].iloc[0]
-    if not df_cultura.empty
-    else "N/A"
+st.markdown(
+    "Participação de cada município no VBP do estado, que compõe 8% do índice da cota-parte do ICMS, "
+    "e a contribuição de cada cultura para essa participação."
 )
 
-cultura_total["Unidade"] = medida
+resumo_participacao, culturas_participacao = obter_participacao(cubo, versao, safra_inicio, safra_fim)
 
-st.text(f"Cultura: {cultura_selecionadas}, Medida: {medida}")
+if cidades_selecionadas:
+    participacao(resumo_participacao, culturas_participacao, cidades_selecionadas)
+else:
+    st.info("Selecione ao menos um município para ver a participação.")
+
+if st.button("Preparar exportação de todos os municípios"):
+    with st.spinner("Gerando arquivo..."):
+        csv_resumo, csv_culturas = exportar_participacao(cubo, versao, safra_inicio, safra_fim)
+
+    col_resumo, col_culturas = st.columns(2)
+    col_resumo.download_button(
+        label="📥 Participação por Município",
+        data=csv_resumo,
+        file_name="Participacao-VBP.csv",
+        mime="text/csv",
+        on_click="ignore",
+    )
+    col_culturas.download_button(
+        label="📥 Contribuição por Cultura",
+        data=csv_culturas,
+        file_name="Participacao-VBP-Culturas.csv",
+        mime="text/csv",
+        on_click="ignore",
+    )
 
-# Envia para o componente/gráfico
-cultura(cultura_total, cultura_selecionadas)
+
+# ===========================================================
+# REGIÃO
+# ===========================================================
+st.subheader("Produção por Região", divider=True)
+
+regioes_selecionadas = st.sidebar.multiselect(
+    "Selecione a(s) Região(ões):",
+    options=list(pacote["regioes"]["regioes"]),
+    key="regioes_selecionadas",
+)
+
+tabela_regiao = obter_regioes(
+    cubo,
+    pacote["regioes"],
+    versao,
+    tuple(regioes_selecionadas),
+    safra_inicio,
+    safra_fim,
+)
+regiao(tabela_regiao)
 
 
 # ===========================================================
@@ -143,6 +243,27 @@ cultura(cultura_total, cultura_selecionadas)
 st.subheader("Números Estaduais", divider=True)
 estado(df[df["Safra_ordem"].between(safra_inicio, safra_fim)])
 
+st.subheader("Distribuição e Concentração do VBP", divider=True)
+distribuicao(obter_distribuicao(cubo, versao, safra_inicio, safra_fim))
+
+
+
+# ===========================================================
+# MAPA
+# ===========================================================
+st.subheader("Mapa do Paraná", divider=True)
+
+col_metrica, col_resolucao = st.columns(2)
+metrica_mapa = col_metrica.selectbox("Indicador do mapa:", options=["VBP", "Área (ha)"])
+resolucao_mapa = col_resolucao.selectbox("Resolução do mapa:", options=list(RESOLUCOES), index=0)
+
+malha = obter_malha(resolucao_mapa)
+
+if malha is None:
+    st.info("Malha municipal não encontrada em data/geo/municipios_pr.geojson.")
+else:
+    codigos, safras_mapa, valores = valores_mapa(cubo, metrica_mapa, safra_inicio, safra_fim)
+    mapa(malha, codigos, safras_mapa, valores, metrica_mapa)
 
 
 # ===========================================================
@@ -0,0 +1,85 @@
+"""Compara os backends de consulta (pandas x DuckDB) nas agregações do Dashboard.
+
+Confere se os dois backends retornam os mesmos resultados e mede o tempo de
+cada consulta. Usa data/vbp.parquet (gravado pelo app a cada versão dos
+dados); sem ele, lê as planilhas e grava o Parquet antes de medir.
+
+Uso (a partir da raiz do projeto):
+
+    python -m scripts.comparar_backends --repeticoes 20
+"""
+import argparse
+import statistics
+import time
+
+import pandas as pd
+
+from components.consulta import ARQUIVO_PARQUET, ConsultaDuckDB, ConsultaPandas, salvar_parquet
+from components.data import carregar_dados
+
+
+MUNICIPIOS = ["CENTENARIO DO SUL", "LONDRINA", "CASCAVEL", "TOLEDO"]
+
+
+def consultas(df: pd.DataFrame) -> dict:
+    safras = sorted(df["Safra_ordem"].unique())
+    inicio, fim = int(safras[0]), int(safras[-1])
+    cultura = df["Cultura"].value_counts().index[0]
+
+    return {
+        "total_municipio_safra": lambda c: c.total_municipio_safra(MUNICIPIOS, inicio, fim),
+        "cultura_municipio_safra": lambda c: c.cultura_municipio_safra(cultura, MUNICIPIOS, inicio, fim),
+        "estatisticas_estado": lambda c: c.estatisticas_estado(inicio, fim),
+        "top_culturas (VBP)": lambda c: c.top_culturas("VBP", inicio, fim),
+        "top_culturas (Área)": lambda c: c.top_culturas("Área (ha)", inicio, fim),
+    }
+
+
+def medir(funcao, repeticoes: int) -> list:
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        tempos.append(time.perf_counter() - inicio)
+    return tempos
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeticoes", type=int, default=10)
+    args = parser.parse_args()
+
+    if not ARQUIVO_PARQUET.exists():
+        salvar_parquet(carregar_dados())
+
+    inicio = time.perf_counter()
+    df = pd.read_parquet(ARQUIVO_PARQUET)
+    print(f"Carga do Parquet no pandas: {time.perf_counter() - inicio:.3f} s")
+
+    inicio = time.perf_counter()
+    backends = [ConsultaPandas(df), ConsultaDuckDB(ARQUIVO_PARQUET)]
+    print(f"Abertura dos backends: {time.perf_counter() - inicio:.3f} s")
+
+    for nome, consulta in consultas(df).items():
+        resultados = [consulta(backend) for backend in backends]
+
+        referencia, outro = (r.reset_index(drop=True) for r in resultados)
+        try:
+            pd.testing.assert_frame_equal(
+                referencia, outro, check_dtype=False, check_exact=False, rtol=1e-6
+            )
+            conferencia = "ok"
+        except AssertionError:
+            conferencia = "DIVERGENTE"
+
+        linha = [f"{nome:<26}"]
+        for backend in backends:
+            tempos = medir(lambda: consulta(backend), args.repeticoes)
+            linha.append(f"{backend.nome} {statistics.median(tempos) * 1000:8.2f} ms")
+        linha.append(f"resultado {conferencia}")
+
+        print(" | ".join(linha))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+"""Teste de carga das páginas Streamlit com sessões simuladas (AppTest).
+
+Cada sessão é um AppTest independente rodando em uma thread, como as
+sessões do servidor, e compartilhando os mesmos caches do processo. Não
+abre navegador nem usa rede.
+
+Uso (a partir da raiz do projeto):
+
+    python -m scripts.teste_carga --sessoes 8 --interacoes 10
+"""
+import argparse
+import random
+import resource
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+from streamlit import config
+from streamlit.runtime import Runtime
+from streamlit.runtime.caching.storage.dummy_cache_storage import MemoryCacheStorageManager
+from streamlit.runtime.media_file_manager import MediaFileManager
+from streamlit.runtime.memory_media_file_storage import MemoryMediaFileStorage
+from streamlit.testing.v1 import AppTest
+
+
+RAIZ = Path(__file__).resolve().parent.parent
+DASHBOARD = str(RAIZ / "pages" / "Dashboard.py")
+DADOS = str(RAIZ / "pages" / "Dados.py")
+TIMEOUT = 600
+
+
+@contextmanager
+def runtime_compartilhado():
+    # O AppTest cria e descarta um Runtime global a cada execução, o que não
+    # permite execuções simultâneas. Aqui todas as sessões usam o mesmo
+    # Runtime (e o mesmo armazenamento de cache), como no servidor real.
+    runtime = MagicMock(spec=Runtime)
+    runtime.media_file_mgr = MediaFileManager(MemoryMediaFileStorage("/mock/media"))
+    runtime.cache_storage_manager = MemoryCacheStorageManager()
+
+    config.set_option("global.appTest", True)
+
+    with patch.object(Runtime, "instance", return_value=runtime), \
+            patch.object(Runtime, "exists", return_value=True):
+        yield
+
+
+def rss_atual_mb() -> float:
+    # Memória residente atual (Linux); cai para o pico quando indisponível
+    try:
+        with open("/proc/self/statm") as f:
+            paginas = int(f.read().split()[1])
+        return paginas * resource.getpagesize() / 1024 ** 2
+    except OSError:
+        return rss_pico_mb()
+
+
+def rss_pico_mb() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def percentil(valores, p):
+    if not valores:
+        return float("nan")
+    ordenados = sorted(valores)
+    posicao = (len(ordenados) - 1) * p
+    baixo = int(posicao)
+    alto = min(baixo + 1, len(ordenados) - 1)
+    return ordenados[baixo] + (ordenados[alto] - ordenados[baixo]) * (posicao - baixo)
+
+
+def executar(at: AppTest, pagina: str, medicoes: dict, trava: threading.Lock):
+    inicio = time.perf_counter()
+    at.run(timeout=TIMEOUT)
+    duracao = time.perf_counter() - inicio
+
+    with trava:
+        medicoes.setdefault(pagina, []).append(duracao)
+        if at.exception:
+            medicoes.setdefault("erros", []).append(f"{pagina}: {at.exception[0].message}")
+
+
+def sessao(numero: int, interacoes: int, medicoes: dict, trava: threading.Lock):
+    aleatorio = random.Random(numero)
+
+    at = AppTest.from_file(DASHBOARD, default_timeout=TIMEOUT)
+    executar(at, "Dashboard", medicoes, trava)
+
+    municipios = at.sidebar.multiselect(key="cidades_selecionadas").options
+    culturas = at.sidebar.selectbox(key="cultura_selecionada").options
+    safras = at.sidebar.select_slider(key="safras_selecionadas").options
+
+    for _ in range(interacoes):
+        acao = aleatorio.choice(["municipios", "safras", "cultura", "dados"])
+
+        if acao == "municipios":
+            escolhidos = aleatorio.sample(municipios, aleatorio.randint(1, 5))
+            at.sidebar.multiselect(key="cidades_selecionadas").set_value(escolhidos)
+        elif acao == "safras":
+            inicio, fim = sorted(aleatorio.sample(range(len(safras)), 2))
+            at.sidebar.select_slider(key="safras_selecionadas").set_range(safras[inicio], safras[fim])
+        elif acao == "cultura":
+            at.sidebar.selectbox(key="cultura_selecionada").select(aleatorio.choice(culturas))
+        else:
+            executar(AppTest.from_file(DADOS, default_timeout=TIMEOUT), "Dados", medicoes, trava)
+            continue
+
+        executar(at, "Dashboard", medicoes, trava)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessoes", type=int, default=4, help="sessões simultâneas")
+    parser.add_argument("--interacoes", type=int, default=10, help="interações por sessão")
+    args = parser.parse_args()
+
+    medicoes = {}
+    trava = threading.Lock()
+
+    with runtime_compartilhado():
+        # Carga a frio: preenche os caches compartilhados antes de medir
+        inicio = time.perf_counter()
+        AppTest.from_file(DASHBOARD, default_timeout=TIMEOUT).run()
+        print(f"Carga a frio: {time.perf_counter() - inicio:.2f} s | RSS: {rss_atual_mb():.0f} MB")
+
+        inicio = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.sessoes) as executor:
+            futuros = [
+                executor.submit(sessao, numero, args.interacoes, medicoes, trava)
+                for numero in range(args.sessoes)
+            ]
+            for futuro in futuros:
+                futuro.result()
+        total = time.perf_counter() - inicio
+
+    execucoes = sum(len(v) for k, v in medicoes.items() if k != "erros")
+
+    print(f"Sessões: {args.sessoes} | Interações por sessão: {args.interacoes}")
+    print(f"Tempo total: {total:.2f} s | Vazão: {execucoes / total:.2f} execuções/s")
+
+    for pagina in ["Dashboard", "Dados"]:
+        tempos = medicoes.get(pagina, [])
+        if tempos:
+            print(
+                f"{pagina}: {len(tempos)} execuções | "
+                f"p50 {percentil(tempos, 0.50):.3f} s | "
+                f"p95 {percentil(tempos, 0.95):.3f} s | "
+                f"média {statistics.mean(tempos):.3f} s"
+            )
+
+    print(f"RSS atual: {rss_atual_mb():.0f} MB | RSS pico: {rss_pico_mb():.0f} MB")
+
+    for erro in medicoes.get("erros", []):
+        print(f"Erro: {erro}")
+
+
+if __name__ == "__main__":
+    main()